@@ -0,0 +1,126 @@
+# matchmaking/common/async_mongo_client.py
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Any, Dict, List, Optional
+from common.config import settings
+from common.logger import Logger, payload
+from common.mongo_client import pool_options
+
+
+logger = Logger.get_logger(name=__name__)
+
+
+class AsyncMongoConnection:
+    """
+    asyncio counterpart of MongoConnection, on PyMongo's native async client.
+    Operations are awaited on the event loop instead of holding a threadpool worker
+    for the whole round trip; pool sizing comes from the MONGO_*_POOL settings.
+    """
+
+    def __init__(self, uri: str = None, db_name: str = None, **client_options: Any):
+        self._uri = uri or str(settings.MONGO_URI)
+        self._db_name = db_name or settings.MONGO_DB
+        self._options = {**pool_options(), **client_options}
+        self._client: Optional[AsyncMongoClient] = None
+        self._db: Optional[AsyncDatabase] = None
+        logger.debug(f"AsyncMongoConnection initialized (uri={self._uri}, db={self._db_name})")
+
+    def connect(self) -> AsyncDatabase:
+        """Create the client; sockets are opened lazily by the pool on first use."""
+        if self._client is not None:
+            return self._db
+        try:
+            self._client = AsyncMongoClient(self._uri, **self._options)
+            self._db = self._client[self._db_name]
+            logger.info(
+                f"Async Mongo client ready at {self._uri}, db={self._db_name} "
+                f"(maxPoolSize={self._options['maxPoolSize']})"
+            )
+            return self._db
+        except Exception as e:
+            logger.exception(f"Async Mongo connect failed (uri={self._uri}, db={self._db_name})")
+            raise RuntimeError(f"Async Mongo connect failed: {e}") from e
+
+    def get_collection(self, name: str) -> AsyncCollection:
+        if self._db is None:
+            self.connect()
+        return self._db[name]
+
+    async def insert(self, coll: str, doc: Dict[str, Any], _id: Any = None) -> str:
+        try:
+            if _id is not None:
+                doc["_id"] = _id
+            result = await self.get_collection(coll).insert_one(doc)
+            final_id = str(result.inserted_id)
+            logger.info(f"Inserted document into '{coll}' with _id={final_id}")
+            return final_id
+        except Exception as e:
+            logger.exception(f"Insert failed (coll={coll}, doc_keys={list(doc.keys())})")
+            raise RuntimeError(f"Insert failed ({coll}): {e}") from e
+
+    async def check_exists_by_id(self, coll: str, _id: Any) -> bool:
+        try:
+            return await self.get_collection(coll).find_one({"_id": _id}, {"_id": 1}) is not None
+        except Exception as e:
+            logger.exception(f"check_exists_by_id failed (coll={coll}, _id={_id})")
+            raise RuntimeError(f"check_exists_by_id failed ({coll}): {e}") from e
+
+    async def find_one(self, coll: str, query: Dict[str, Any],
+                       projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.get_collection(coll).find_one(query, projection)
+            logger.debug("find_one on '%s' with query=%s → %s", coll, payload(query), result is not None)
+            return result
+        except Exception as e:
+            logger.exception(f"find_one failed (coll={coll}, query={query})")
+            raise RuntimeError(f"find_one failed ({coll}): {e}") from e
+
+    async def find(self, coll: str, query: Dict[str, Any],
+                   projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        try:
+            return await self.get_collection(coll).find(query, projection).to_list()
+        except Exception as e:
+            logger.exception(f"find failed (coll={coll}, query={query})")
+            raise RuntimeError(f"find failed ({coll}): {e}") from e
+
+    async def update(self, coll: str, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        try:
+            if not any(k.startswith("$") for k in update.keys()):
+                update = {"$set": update}
+            res = await self.get_collection(coll).update_one(query, update, upsert=upsert)
+            logger.info(
+                f"update_one on '{coll}' (matched={res.matched_count}, modified={res.modified_count}) "
+                f"query={query}, update_keys={list(update.keys())}"
+            )
+            return res
+        except Exception as e:
+            logger.exception(
+                f"update failed (coll={coll}, query={query}, update_keys={list(update.keys())})"
+            )
+            raise RuntimeError(f"update failed ({coll}): {e}") from e
+
+    async def bulk_write(self, coll: str, operations: List[Any], ordered: bool = False):
+        if not operations:
+            return None
+        try:
+            res = await self.get_collection(coll).bulk_write(operations, ordered=ordered)
+            logger.info(
+                f"bulk_write on '{coll}' ({len(operations)} ops: matched={res.matched_count}, "
+                f"modified={res.modified_count}, upserted={res.upserted_count})"
+            )
+            return res
+        except Exception as e:
+            logger.exception(f"bulk_write failed (coll={coll}, ops={len(operations)})")
+            raise RuntimeError(f"bulk_write failed ({coll}): {e}") from e
+
+    async def close(self):
+        try:
+            if self._client:
+                await self._client.close()
+                logger.info("Async MongoDB connection closed")
+        except Exception:
+            logger.exception("Async Mongo close failed")
+        finally:
+            self._client = None
+            self._db = None
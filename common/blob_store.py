@@ -0,0 +1,195 @@
+# matchmaking/common/blob_store.py
+import hashlib
+import json
+import os
+import tempfile
+import gridfs
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+from common.config import settings
+from common.logger import Logger
+from common.mongo_client import mongo
+
+logger = Logger.get_logger(name=__name__)
+
+_HEX = set("0123456789abcdef")
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class BlobInfo:
+    ref: str            # sha256 hex of the content
+    size: int
+    content_type: str
+
+
+def valid_ref(ref: str) -> bool:
+    return len(ref) == 64 and set(ref) <= _HEX
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed store for binary blobs (profile photos): a blob's reference is the
+    sha256 of its bytes, so identical uploads are stored once and a reference never changes
+    meaning - which makes served blobs cacheable forever.
+    """
+
+    def __init__(self, max_bytes: int = None, chunk_bytes: int = None):
+        self.max_bytes = max_bytes or settings.PHOTO_MAX_BYTES
+        self.chunk_bytes = chunk_bytes or settings.PHOTO_CHUNK_BYTES
+
+    def _chunks(self, source: BinaryIO) -> Iterator[bytes]:
+        """Read source chunk by chunk, refusing to go past max_bytes."""
+        total = 0
+        while True:
+            chunk = source.read(self.chunk_bytes)
+            if not chunk:
+                return
+            total += len(chunk)
+            if total > self.max_bytes:
+                raise BlobTooLarge(f"blob exceeds {self.max_bytes} bytes")
+            yield chunk
+
+    @abstractmethod
+    def put(self, source: BinaryIO, content_type: str = "application/octet-stream") -> BlobInfo:
+        """Stream source into the store; raises BlobTooLarge past max_bytes (nothing is kept)."""
+        ...
+
+    @abstractmethod
+    def info(self, ref: str) -> Optional[BlobInfo]:
+        ...
+
+    @abstractmethod
+    def open(self, ref: str) -> Optional[Tuple[BlobInfo, Iterator[bytes]]]:
+        """(info, chunk iterator) or None if ref is unknown."""
+        ...
+
+    def read(self, ref: str) -> Optional[bytes]:
+        opened = self.open(ref)
+        return b"".join(opened[1]) if opened else None
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under root/ab/cd/<sha256>, with a <sha256>.json sidecar for metadata."""
+
+    def __init__(self, root: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root or settings.PHOTO_STORE_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.root, ref[:2], ref[2:4], ref)
+
+    def put(self, source: BinaryIO, content_type: str = "application/octet-stream") -> BlobInfo:
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in self._chunks(source):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            info = BlobInfo(digest.hexdigest(), size, content_type)
+            path = self._path(info.ref)
+            if os.path.exists(path):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(f"{path}.json", "w") as meta:
+                    json.dump({"size": size, "content_type": content_type}, meta)
+                os.replace(tmp, path)
+                logger.info("Stored blob %s (%d bytes)", info.ref, size)
+            return info
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def info(self, ref: str) -> Optional[BlobInfo]:
+        if not valid_ref(ref) or not os.path.exists(self._path(ref)):
+            return None
+        try:
+            with open(f"{self._path(ref)}.json") as meta:
+                data = json.load(meta)
+        except OSError:
+            data = {"size": os.path.getsize(self._path(ref)), "content_type": "application/octet-stream"}
+        return BlobInfo(ref, data["size"], data["content_type"])
+
+    def open(self, ref: str) -> Optional[Tuple[BlobInfo, Iterator[bytes]]]:
+        info = self.info(ref)
+        if info is None:
+            return None
+
+        def chunks():
+            with open(self._path(ref), "rb") as f:
+                while chunk := f.read(self.chunk_bytes):
+                    yield chunk
+
+        return info, chunks()
+
+
+class GridFSBlobStore(BlobStore):
+    """Blobs in a GridFS bucket, one file per blob with filename = sha256."""
+
+    def __init__(self, db, bucket_name: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name or settings.PHOTO_GRIDFS_BUCKET,
+                                          chunk_size_bytes=self.chunk_bytes)
+        self.files = db[f"{bucket_name or settings.PHOTO_GRIDFS_BUCKET}.files"]
+
+    def put(self, source: BinaryIO, content_type: str = "application/octet-stream") -> BlobInfo:
+        digest = hashlib.sha256()
+        size = 0
+        # the name is only known at the end, so upload under a temporary one and rename
+        stream = self.bucket.open_upload_stream("pending", metadata={"content_type": content_type})
+        try:
+            for chunk in self._chunks(source):
+                digest.update(chunk)
+                size += len(chunk)
+                stream.write(chunk)
+            stream.close()
+        except BaseException:
+            stream.abort()
+            raise
+        info = BlobInfo(digest.hexdigest(), size, content_type)
+        if self.files.find_one({"filename": info.ref}, {"_id": 1}):
+            self.bucket.delete(stream._id)
+        else:
+            self.bucket.rename(stream._id, info.ref)
+            logger.info("Stored blob %s (%d bytes) in GridFS", info.ref, size)
+        return info
+
+    def info(self, ref: str) -> Optional[BlobInfo]:
+        if not valid_ref(ref):
+            return None
+        doc = self.files.find_one({"filename": ref}, {"length": 1, "metadata": 1})
+        if not doc:
+            return None
+        return BlobInfo(ref, doc["length"], (doc.get("metadata") or {}).get("content_type", "application/octet-stream"))
+
+    def open(self, ref: str) -> Optional[Tuple[BlobInfo, Iterator[bytes]]]:
+        info = self.info(ref)
+        if info is None:
+            return None
+        stream = self.bucket.open_download_stream_by_name(ref)
+
+        def chunks():
+            with stream:
+                while chunk := stream.readchunk():
+                    yield chunk
+
+        return info, chunks()
+
+
+def create_blob_store(backend: str = None) -> BlobStore:
+    backend = (backend or settings.PHOTO_STORE_BACKEND).lower()
+    if backend == "local":
+        return LocalBlobStore()
+    if backend == "gridfs":
+        return GridFSBlobStore(mongo.connect())
+    raise ValueError(f"unknown PHOTO_STORE_BACKEND {backend!r}")
@@ -17,6 +17,18 @@ class AppSettings(BaseSettings):
     MONGO_COLL_PROFILESS: str = Field("profiles", description="mongo collection for profiles")
     MONGO_COLL_LOGINS:str = Field("tokens",description="mongo collection for login")
     MONGO_COLL_LIKES: str = Field("likes", description="likes collection name")
+    FEEDBACK_STORAGE_MODE: str = Field("arrays", description="arrays (one likes doc per user) | edges (one doc per actor/target)")
+    MONGO_COLL_FEEDBACK_EDGES: str = Field("feedback_edges", description="Feedback edges collection (edges mode)")
+    MONGO_COLL_USERS: str = Field("users", description="API login users")
+    MONGO_ENSURE_INDEXES: bool = Field(True, description="Create the required indexes (common/mongo_indexes.py) at service startup")
+    MONGO_COLL_CANDIDATES: str = Field("candidates", description="Scored match candidates, one document per user")
+    CANDIDATES_TOP_K: int = Field(200, description="Max candidates kept per user (best reciprocal score first)")
+    WAITING_MATCHES_PAGE_SIZE: int = Field(20, description="Default page size of GET /waiting_matches")
+    WAITING_MATCHES_MAX_PAGE_SIZE: int = Field(100, description="Largest page GET /waiting_matches serves")
+    MONGO_MAX_POOL_SIZE: int = Field(100, description="Max connections per Mongo server in a client pool")
+    MONGO_MIN_POOL_SIZE: int = Field(0, description="Connections kept open per Mongo server when idle")
+    MONGO_MAX_CONNECTING: int = Field(2, description="Max connections a pool establishes concurrently")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = Field(None, description="Max wait for a free pooled connection (None = no limit)")
     PROFILE_ID_FIELD: str = "profile_id"
     LIKES_FIELD: str = "likes"
     DISLIKES_FIELD: str = "dislikes"
@@ -25,11 +37,36 @@ class AppSettings(BaseSettings):
     ES_URL: AnyUrl = Field("http://localhost:9200", description="Elasticsearch base URL")
     ES_INDEX_PROFILES: str = Field("profiles_v1", description="Profiles index name")
     ES_ALIAS_PROFILES: str = Field("profiles_active", description="Alias for blue/green")
+    ES_CONNECTIONS_PER_NODE: int = Field(10, description="HTTP connection pool size per ES node")
+    ES_HTTP_KEEP_ALIVE: bool = Field(True, description="Reuse ES HTTP connections between requests")
+    ES_HTTP_COMPRESS: bool = Field(False, description="gzip ES request bodies")
+    ES_PROFILE_SHARDS: int = Field(1, description="Primary shards per gender index")
+    ES_PROFILE_REPLICAS: int = Field(1, description="Replicas per gender index")
+    ES_PROFILE_REFRESH_INTERVAL: str = Field("5s", description="refresh_interval of the gender indices")
+    ES_HNSW_M: int = Field(16, description="HNSW graph degree of the vector fields")
+    ES_HNSW_EF_CONSTRUCTION: int = Field(100, description="HNSW ef_construction of the vector fields")
+    MATCH_BACKEND: str = Field("elastic", description="elastic | memory (in-process NumPy matrices)")
+    MATCH_MEMORY_DTYPE: str = Field("float32", description="float32 | float16 storage of the memory backend")
+    MATCH_MEMORY_WARM_START: bool = Field(True, description="Load all profiles from Mongo into the memory backend")
+    MATCH_SEARCH_MODE: str = Field("exact", description="exact (script_score over all docs) | knn (HNSW candidates + rescore)")
+    MATCH_CANDIDATES_PER_PROFILE: int = Field(10, description="Matches searched (and stored both ways) per indexed profile")
+    MATCH_KNN_K: int = Field(50, description="Candidates fetched per vector in knn mode")
+    MATCH_KNN_NUM_CANDIDATES: int = Field(200, description="HNSW num_candidates per shard in knn mode")
 
     # ---- Kafka ----
 
     KAFKA_BROKERS: str = Field("localhost:9092", description="Comma-separated brokers")
     KAFKA_CLIENT_ID: str = Field("matchmaking-app", description="Kafka client.id")
+    KAFKA_PRODUCER_BATCH_SIZE: int = Field(64 * 1024, description="Max bytes per producer partition batch")
+    KAFKA_PRODUCER_LINGER_MS: int = Field(5, description="Time a batch may wait for more messages")
+    KAFKA_PRODUCER_COMPRESSION: Optional[str] = Field(None, description="gzip | snappy | lz4 | zstd | None")
+    KAFKA_PRODUCER_BUFFER_MEMORY: int = Field(32 * 1024 * 1024, description="Producer send buffer (bytes)")
+    KAFKA_PRODUCER_MAX_BLOCK_MS: int = Field(5000, description="How long send blocks on a full buffer before failing")
+    KAFKA_CONSUMER_FETCH_MIN_BYTES: int = Field(1, description="Broker holds a fetch until this many bytes are ready")
+    KAFKA_CONSUMER_FETCH_MAX_WAIT_MS: int = Field(500, description="Max time the broker holds a fetch for fetch_min_bytes")
+    KAFKA_CONSUMER_MAX_POLL_RECORDS: int = Field(500, description="Max records returned by a single poll()")
+    KAFKA_CONSUMER_MAX_PARTITION_FETCH_BYTES: int = Field(1024 * 1024, description="Max bytes fetched per partition")
+    KAFKA_CONSUMER_RETRY_BACKOFF_MS: int = Field(1000, description="Pause before a failed batch is redelivered")
 
 
     TOPIC_PROFILES_CREATEDD: str = "profiles_create"
@@ -41,9 +78,70 @@ class AppSettings(BaseSettings):
     TOPIC_MATCHES: str = "matches.created"
     KAFKA_GROUP_MATCH_ENGINE: str = "match_engine"
 
+    # ---- Match engine ----
+    MATCH_ENGINE_BATCH_MODE: bool = Field(True, description="Decide feedbacks per poll batch (one Mongo query)")
+    MATCH_ENGINE_BATCH_SIZE: int = Field(200, description="Max feedback events per match-engine batch")
+    MATCH_ENGINE_BATCH_WAIT_MS: int = Field(100, description="Max time to wait while filling a batch")
+    MATCH_ENGINE_WORKERS: int = Field(0, description="Parallel workers keyed by actor/target pair (0 = off)")
+    MATCH_ENGINE_WORKER_QUEUE_SIZE: int = Field(1000, description="Max queued events per match-engine worker")
+    MATCH_ENGINE_GRAPH_CACHE: bool = Field(False, description="Decide from an in-memory like graph instead of Mongo")
+    MATCH_ENGINE_GRAPH_SNAPSHOT_PATH: str = Field(".cache/like_graph.snapshot", description="LikeGraph snapshot file")
+    MATCH_ENGINE_GRAPH_SNAPSHOT_INTERVAL_S: int = Field(300, description="Seconds between LikeGraph snapshots")
+
+    # ---- Enricher ----
+    ENRICHER_GROUP_ID: str = Field("enricher", description="Consumer group of the enricher")
+    ENRICHER_BATCH_SIZE: int = Field(32, description="Max profiles per enricher batch")
+    ENRICHER_BATCH_WAIT_MS: int = Field(200, description="Max time to wait while filling an enricher batch")
+    ENRICHER_WORKERS: int = Field(0, description="Thumbnail worker processes (0 = one per CPU)")
+    ENRICHER_THUMBNAIL_SIZES: List[int] = Field([128, 512], description="Longest edge (px) of each thumbnail")
+    ENRICHER_THUMBNAIL_QUALITY: int = Field(85, description="JPEG quality of thumbnails")
+
+    # ---- Indexer ----
+    INDEXER_INPUT_TOPIC: str = Field("profiles_enriched", description="profiles_enriched (after the enricher) | profiles_create")
+    INDEXER_BATCH_MODE: bool = Field(True, description="Embed & index consumed profiles in micro-batches")
+    INDEXER_BATCH_SIZE: int = Field(64, description="Max profiles per indexer micro-batch")
+    INDEXER_BATCH_WAIT_MS: int = Field(200, description="Max time to wait while filling a micro-batch")
+    INDEXER_REFRESH_POLICY: str = Field("batch", description="true | wait_for | none | batch (see RefreshScheduler)")
+    INDEXER_REFRESH_INTERVAL_MS: int = Field(1000, description="Min time between refreshes with the batch policy")
+    EMBEDDING_ENCODE_BATCH_SIZE: int = Field(64, description="batch_size passed to model.encode")
+    EMBEDDING_MODEL_NAME: str = Field("all-MiniLM-L6-v2", description="SentenceTransformer model name")
+    EMBEDDING_INT8: bool = Field(False, description="Dynamically quantized int8 CPU inference")
+    EMBEDDING_WARMUP: bool = Field(True, description="Run a warmup batch right after loading the model")
+    EMBEDDING_DIM: int = Field(384, description="Embedding vector size of EMBEDDING_MODEL_NAME")
+    EMBEDDING_CACHE_ENABLED: bool = Field(True, description="Cache embeddings by (model, text) hash")
+    EMBEDDING_CACHE_DIR: str = Field(".cache/embeddings", description="Directory of the on-disk embedding store")
+    EMBEDDING_CACHE_LRU_SIZE: int = Field(50_000, description="In-memory LRU entries in front of the disk store")
+
+    # ---- Photos ----
+    PHOTO_STORE_BACKEND: str = Field("local", description="local (filesystem) | gridfs")
+    PHOTO_STORE_DIR: str = Field("data/photos", description="Root directory of the local photo store")
+    PHOTO_GRIDFS_BUCKET: str = Field("photos", description="GridFS bucket of the gridfs photo store")
+    PHOTO_MAX_BYTES: int = Field(5 * 1024 * 1024, description="Largest accepted photo upload")
+    PHOTO_CHUNK_BYTES: int = Field(256 * 1024, description="Read/write chunk size for photo streams")
+    PHOTO_CACHE_MAX_AGE_S: int = Field(365 * 24 * 3600, description="Cache-Control max-age of served photos")
+
+    # ---- Profile summary cache (API) ----
+    PROFILE_CACHE_MAX_ENTRIES: int = Field(100_000, description="Profile summaries kept in memory per API process (0 = no caching)")
+    PROFILE_CACHE_TTL_S: float = Field(300, description="Max age of a cached summary, also the staleness bound without Kafka")
+    PROFILE_CACHE_INVALIDATION_TOPICS: List[str] = Field(["profiles_create", "profiles_enriched"],
+                                                         description="Topics whose profile ids are evicted from the cache")
+    PROFILE_CACHE_LATENCY_WINDOW: int = Field(4096, description="Recent get_many latencies kept for the p50/p99 stats")
+
+    # ---- Profile export (API) ----
+    PROFILE_EXPORT_BATCH_SIZE: int = Field(1000, description="Documents per cursor batch of GET /add_person/people")
+    PROFILE_EXPORT_CHUNK_BYTES: int = Field(64 * 1024, description="NDJSON bytes buffered per streamed chunk")
+
     # ---- API / misc ----
     APP_ENV: str = Field("dev", description="dev | staging | prod")
-    LOG_LEVEL: str = Field("INFO")
+    LOG_LEVEL: str = Field("INFO", description="Default level of every logger")
+    LOG_LEVELS: str = Field("", description="Per-module overrides, e.g. 'services.match_engine=WARNING,common.kafka_consumer=DEBUG'")
+    LOG_MAX_FIELD_CHARS: int = Field(200, description="Longer string fields are truncated in logged payloads")
+    LOG_SAMPLE_EVERY: int = Field(100, description="Sampled hot-path logs emit 1 in N")
+    ES_INDEX_LOGGER: str = Field("logs", description="ES index the log shipper writes to (non-dev envs)")
+    LOG_SHIP_BATCH_SIZE: int = Field(500, description="Log records per _bulk request")
+    LOG_SHIP_FLUSH_INTERVAL_MS: int = Field(1000, description="Max time a log record waits before shipping")
+    LOG_SHIP_BUFFER_SIZE: int = Field(10_000, description="Max log records buffered for shipping")
+    LOG_SHIP_DROP_POLICY: str = Field("drop_oldest", description="drop_oldest | drop_newest when the buffer is full")
     ALLOW_ORIGINS: Optional[List[str]] = None
     SERVICE_NAME: Optional[str] = None  # each service can override
 
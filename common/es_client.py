@@ -1,6 +1,7 @@
 # matchmaking/common/elastic_client.py
 from __future__ import annotations
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from elasticsearch import Elasticsearch, exceptions
 from elasticsearch.helpers import bulk
 from common.logger import Logger
@@ -8,29 +9,92 @@ from common.config import settings
 
 logger = Logger.get_logger(name=__name__)
 
+# ---------- process-wide registry ----------
+# one pooled Elasticsearch client per URL, one Elastic wrapper per (URL, index),
+# and the indices already known to exist - so hot paths never ping / exists-check again
+_registry_lock = threading.RLock()
+_clients: Dict[str, Elasticsearch] = {}
+_elastics: Dict[Tuple[str, str], "Elastic"] = {}
+_existing_indices: Set[Tuple[str, str]] = set()
+
+
+def new_client(url: str, timeout: int = 30) -> Elasticsearch:
+    return Elasticsearch(
+        url,
+        request_timeout=timeout,
+        connections_per_node=settings.ES_CONNECTIONS_PER_NODE,
+        http_compress=settings.ES_HTTP_COMPRESS,
+        headers=None if settings.ES_HTTP_KEEP_ALIVE else {"connection": "close"},
+        retry_on_timeout=True,
+    )
+
+
+def get_client(url: Optional[str] = None, timeout: int = 30) -> Elasticsearch:
+    url = str(url or settings.ES_URL)
+    with _registry_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = new_client(url, timeout)
+            if not client.ping():
+                logger.error("Elasticsearch ping failed")
+                raise exceptions.ConnectionError("Elasticsearch is not responding")
+            _clients[url] = client
+            logger.info(f"Pooled Elasticsearch client created (url={url}, "
+                        f"connections_per_node={settings.ES_CONNECTIONS_PER_NODE})")
+        return client
+
+
+def get_elastic(index_name: str, url: Optional[str] = None, mapping: Optional[Dict[str, Any]] = None) -> "Elastic":
+    key = (str(url or settings.ES_URL), index_name)
+    with _registry_lock:
+        elastic = _elastics.get(key)
+        if elastic is None:
+            elastic = Elastic(key[0], index_name, mapping=mapping)
+            _elastics[key] = elastic
+        return elastic
+
+
+def close_clients():
+    with _registry_lock:
+        for url, client in _clients.items():
+            try:
+                client.transport.close()
+                logger.info(f"Elasticsearch client closed (url={url})")
+            except Exception as e:
+                logger.error(f"close error: {e}")
+        _clients.clear()
+        _elastics.clear()
+        _existing_indices.clear()
+
 
 class Elastic:
 
 
     def __init__(self, url: Optional[str] = None, index_name: Optional[str] = None, timeout: int = 30,
-                 mapping: Optional[Dict[str, Any]] = None, create_if_missing: bool = True):
+                 mapping: Optional[Dict[str, Any]] = None, create_if_missing: bool = True, pooled: bool = True):
         self.url = str(url or settings.ES_URL)
         self.index_name = index_name or settings.ES_INDEX_PROFILES
         self.timeout = timeout
+        self.pooled = pooled
 
         try:
-            self.es = Elasticsearch(self.url, request_timeout=self.timeout)
-            if not self.es.ping():
-                logger.error("Elasticsearch ping failed")
-                raise exceptions.ConnectionError("Elasticsearch is not responding")
+            if pooled:
+                self.es = get_client(self.url, self.timeout)
+            else:
+                self.es = new_client(self.url, self.timeout)
+                if not self.es.ping():
+                    logger.error("Elasticsearch ping failed")
+                    raise exceptions.ConnectionError("Elasticsearch is not responding")
 
-            if create_if_missing and not self.es.indices.exists(index=self.index_name):
-                logger.info(f"Index '{self.index_name}' not found. Creating...")
-                if mapping:
-                    self.es.indices.create(index=self.index_name, **mapping)
-                else:
-                    self.es.indices.create(index=self.index_name)
-                logger.info(f"Index '{self.index_name}' created")
+            if create_if_missing and (self.url, self.index_name) not in _existing_indices:
+                if not self.es.indices.exists(index=self.index_name):
+                    logger.info(f"Index '{self.index_name}' not found. Creating...")
+                    if mapping:
+                        self.es.indices.create(index=self.index_name, **mapping)
+                    else:
+                        self.es.indices.create(index=self.index_name)
+                    logger.info(f"Index '{self.index_name}' created")
+                _existing_indices.add((self.url, self.index_name))
         except Exception as e:
             logger.exception(f"Failed to init Elasticsearch: {e}")
             raise
@@ -118,15 +182,92 @@ class Elastic:
             logger.error(f"update_docs failed: {e}")
             return False
 
-    def search(self, index, query=None, knn=None, size=3):
+    def bulk_upsert(self, docs_to_upsert: List[Tuple[str, str, Dict[str, Any]]], refresh: Optional[str] = None) -> bool:
+        """
+        docs_to_upsert = [(index, doc_id, {'field': 'val'}), ...]
+        all docs go out in a single _bulk request, so one refresh covers the whole batch
+        """
+        try:
+            actions = [
+                {"_op_type": "update", "_index": index, "_id": doc_id, "doc": fields, "doc_as_upsert": True}
+                for index, doc_id, fields in docs_to_upsert
+            ]
+            success, errors = bulk(self.es, actions, raise_on_error=False, refresh=refresh,
+                                   chunk_size=max(len(actions), 1))
+            if errors:
+                logger.error(f"bulk upsert had errors: {errors[:3]}... (total={len(errors)})")
+            logger.info(f"Bulk upserted {success} docs (requested {len(docs_to_upsert)})")
+            return not errors
+        except Exception as e:
+            logger.error(f"bulk_upsert failed: {e}")
+            return False
+
+    def search(self, index, query=None, knn=None, size=3, source=None):
         try:
             if knn:
-                return self.es.search(index=index, knn=knn, size=size)
+                return self.es.search(index=index, knn=knn, size=size, source=source)
             elif query:
-                return self.es.search(index=index, query=query, size=size)
+                return self.es.search(index=index, query=query, size=size, source=source)
         except Exception as e:
             logger.error(f"search failed: {e}")
 
+    # ---------- templates & aliases ----------
+    def put_index_template(self, name: str, index_patterns: List[str], body: Dict[str, Any]) -> bool:
+        try:
+            self.es.indices.put_index_template(name=name, index_patterns=index_patterns,
+                                               template=body, priority=100)
+            logger.info(f"Index template '{name}' applied to {index_patterns}")
+            return True
+        except Exception as e:
+            logger.error(f"put_index_template({name}) failed: {e}")
+            return False
+
+    def alias_indices(self, alias: str) -> List[str]:
+        """Concrete indices behind an alias ([] if the alias does not exist)."""
+        try:
+            if not self.es.indices.exists_alias(name=alias):
+                return []
+            return list(self.es.indices.get_alias(name=alias).keys())
+        except Exception as e:
+            logger.error(f"alias_indices({alias}) error: {e}")
+            return []
+
+    def ensure_alias(self, alias: str, concrete_index: str, extra_aliases: Sequence[str] = ()) -> bool:
+        """Create concrete_index (template mapping applies) + aliases, unless the alias or a legacy index exists."""
+        try:
+            if self.es.indices.exists(index=alias):
+                return True
+            if not self.es.indices.exists(index=concrete_index):
+                self.es.indices.create(index=concrete_index)
+            actions = [{"add": {"index": concrete_index, "alias": name}} for name in (alias, *extra_aliases)]
+            self.es.indices.update_aliases(actions=actions)
+            logger.info(f"Alias '{alias}' -> '{concrete_index}' created")
+            return True
+        except Exception as e:
+            logger.error(f"ensure_alias({alias}) failed: {e}")
+            return False
+
+    def swap_alias(self, alias: str, new_index: str, extra_aliases: Sequence[str] = ()) -> List[str]:
+        """
+        Atomically point alias (and extra_aliases) at new_index; returns the indices it left.
+        A legacy concrete index that has the alias' own name is removed in the same atomic call.
+        """
+        old_indices = self.alias_indices(alias)
+        actions: List[Dict[str, Any]] = []
+        if not old_indices and self.es.indices.exists(index=alias):
+            actions.append({"remove_index": {"index": alias}})
+            old_indices = [alias]
+        for old in old_indices:
+            if old == alias:
+                continue
+            for name in (alias, *extra_aliases):
+                actions.append({"remove": {"index": old, "alias": name, "must_exist": False}})
+        for name in (alias, *extra_aliases):
+            actions.append({"add": {"index": new_index, "alias": name}})
+        self.es.indices.update_aliases(actions=actions)
+        logger.info(f"Alias '{alias}' swapped {old_indices} -> '{new_index}'")
+        return old_indices
+
     # ---------- Query ----------
     def count(self) -> int:
         try:
@@ -139,6 +280,9 @@ class Elastic:
 
     # ---------- lifecycle ----------
     def close(self):
+        """Pooled clients are shared by the whole process - they are closed by close_clients()."""
+        if self.pooled:
+            return
         try:
             self.es.transport.close()
             logger.info("Elasticsearch client closed")
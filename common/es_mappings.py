@@ -0,0 +1,57 @@
+# matchmaking/common/es_mappings.py
+from typing import Any, Dict, List
+from common.config import settings
+
+PROFILE_GENDER_ALIASES = ["male", "female"]
+PROFILE_VECTOR_FIELDS = ["text_self_vector", "text_for_search_vector"]
+PROFILE_TEMPLATE_NAME = "profiles"
+# filter fields from the enricher; new fields, so they can be added to existing indices with put_mapping
+PROFILE_FILTER_MAPPINGS = {
+    "location_norm": {"type": "keyword"},
+    "age_bucket": {"type": "keyword"},
+    "age": {"type": "integer"},
+}
+
+
+def vector_field(dims: int) -> Dict[str, Any]:
+    return {
+        "type": "dense_vector",
+        "dims": dims,
+        "index": True,
+        "similarity": "cosine",
+        # HNSW graph over int8 scalar-quantized vectors (~4x less memory); raw floats are kept for rescoring
+        "index_options": {
+            "type": "int8_hnsw",
+            "m": settings.ES_HNSW_M,
+            "ef_construction": settings.ES_HNSW_EF_CONSTRUCTION,
+        },
+    }
+
+
+def profile_index_body() -> Dict[str, Any]:
+    """settings + mappings of a profile (gender) index; usable as Elastic(mapping=...) or a template body."""
+    return {
+        "settings": {
+            "number_of_shards": settings.ES_PROFILE_SHARDS,
+            "number_of_replicas": settings.ES_PROFILE_REPLICAS,
+            "refresh_interval": settings.ES_PROFILE_REFRESH_INTERVAL,
+        },
+        "mappings": {
+            # vectors live in the HNSW graph / doc values only - never shipped back in _source
+            "_source": {"excludes": PROFILE_VECTOR_FIELDS},
+            "properties": {
+                "id": {"type": "keyword"},
+                **PROFILE_FILTER_MAPPINGS,
+                **{field: vector_field(settings.EMBEDDING_DIM) for field in PROFILE_VECTOR_FIELDS},
+            },
+        },
+    }
+
+
+def profile_index_patterns() -> List[str]:
+    return [f"{alias}_*" for alias in PROFILE_GENDER_ALIASES]
+
+
+def versioned_index_name(alias: str, version: str = None) -> str:
+    """male -> male_profiles_v1 ; the concrete index behind the 'male' alias."""
+    return f"{alias}_{version or settings.ES_INDEX_PROFILES}"
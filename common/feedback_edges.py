@@ -0,0 +1,50 @@
+# matchmaking/common/feedback_edges.py
+"""
+Edge-per-document feedback layout (FEEDBACK_STORAGE_MODE=edges): one document per
+(actor_id, target_id) with the actor's current status for the target, unique on the pair.
+The default "arrays" layout keeps likes / dislikes / waiting arrays in one document per actor.
+"""
+from datetime import datetime
+from typing import Dict, List
+from common.config import settings
+
+FEEDBACK_STATUSES = ("likes", "dislikes", "waiting")
+EDGE_KEY = [("actor_id", 1), ("target_id", 1)]
+
+
+def edges_mode() -> bool:
+    mode = settings.FEEDBACK_STORAGE_MODE.lower()
+    if mode not in ("arrays", "edges"):
+        raise ValueError(f"unknown FEEDBACK_STORAGE_MODE {mode!r}")
+    return mode == "edges"
+
+
+def edge_filter(actor_id: str, target_id: str) -> dict:
+    return {"actor_id": actor_id, "target_id": target_id}
+
+
+def edge_update(status: str, now: datetime) -> dict:
+    """Upsert body of a feedback written by the API: the newest status always wins."""
+    return {"$set": {"status": status, "updated_at": now}, "$setOnInsert": {"created_at": now}}
+
+
+def migrated_edge_update(status: str, now: datetime) -> List[Dict]:
+    """
+    Pipeline upsert body of an edge copied from the arrays layout. Edges the API already wrote
+    (they carry updated_at) keep their status, so the migration can run again after the switch
+    to edges mode to pick up what changed in between.
+    """
+    return [{"$set": {
+        "status": {"$cond": [{"$eq": [{"$type": "$updated_at"}, "missing"]}, status, "$status"]},
+        "created_at": {"$ifNull": ["$created_at", now]},
+        "migrated_at": now,
+    }}]
+
+
+def statuses_of(doc: dict) -> Dict[str, str]:
+    """{target: status} of an arrays-layout document; dislikes win over likes over waiting."""
+    statuses = {}
+    for status in ("waiting", "likes", "dislikes"):
+        for target in doc.get(status) or []:
+            statuses[target] = status
+    return statuses
@@ -1,14 +1,23 @@
 # matchmaking/common/kafka_consumer.py
-from kafka import KafkaConsumer
-from kafka.errors import NoBrokersAvailable
+from kafka import KafkaConsumer, OffsetAndMetadata, TopicPartition
+from kafka.errors import CommitFailedError, NoBrokersAvailable
 import json
-from typing import Optional, Iterable
+import time
+from typing import Dict, Iterator, Optional, Iterable, List
 from common.logger import Logger
 from common.config import settings
 
 logger = Logger.get_logger(name=__name__)
 
 
+def _value_deserializer(v):
+    return json.loads(v.decode("utf-8"))
+
+
+def _key_deserializer(k):
+    return k.decode("utf-8") if k else None
+
+
 class Consumer:
 
 
@@ -19,9 +28,16 @@ class Consumer:
         bootstrap_servers: Optional[str] = None,
         auto_offset_reset: str = "earliest",
         enable_auto_commit: bool = True,
+        fetch_min_bytes: Optional[int] = None,
+        fetch_max_wait_ms: Optional[int] = None,
+        max_poll_records: Optional[int] = None,
+        max_partition_fetch_bytes: Optional[int] = None,
     ):
         self.consumer: Optional[KafkaConsumer] = None
         brokers = bootstrap_servers or settings.KAFKA_BROKERS
+        self.brokers = brokers
+        self.enable_auto_commit = enable_auto_commit
+        self._rewound = False
         try:
             self.consumer = KafkaConsumer(
                 *topics,
@@ -29,10 +45,18 @@ class Consumer:
                 group_id=group_id,
                 auto_offset_reset=auto_offset_reset,
                 enable_auto_commit=enable_auto_commit,
-                value_deserializer=lambda v: json.loads(v.decode("utf-8")),
-                key_deserializer=lambda k: k.decode("utf-8") if k else None,
+                value_deserializer=_value_deserializer,
+                key_deserializer=_key_deserializer,
+                # a broker-side wait for fetch_min_bytes turns many tiny fetches into a few full ones
+                fetch_min_bytes=fetch_min_bytes or settings.KAFKA_CONSUMER_FETCH_MIN_BYTES,
+                fetch_max_wait_ms=fetch_max_wait_ms or settings.KAFKA_CONSUMER_FETCH_MAX_WAIT_MS,
+                max_poll_records=max_poll_records or settings.KAFKA_CONSUMER_MAX_POLL_RECORDS,
+                max_partition_fetch_bytes=max_partition_fetch_bytes or settings.KAFKA_CONSUMER_MAX_PARTITION_FETCH_BYTES,
+            )
+            logger.info(
+                f"KafkaConsumer subscribed (topics={topics}, group={group_id}, brokers={brokers}, "
+                f"auto_commit={enable_auto_commit})"
             )
-            logger.info(f"KafkaConsumer subscribed (topics={topics}, group={group_id}, brokers={brokers})")
         except NoBrokersAvailable:
             logger.error(f"No Kafka brokers available at {brokers}")
         except Exception as e:
@@ -53,6 +77,135 @@ class Consumer:
         except Exception as e:
             logger.error(f"KafkaConsumer listen error: {e}")
 
+    def poll_batch(self, max_records: int = 500, max_wait_ms: int = 1000) -> List:
+        """Collect up to max_records messages, waiting at most max_wait_ms for the batch to fill."""
+        if not self.consumer:
+            logger.error("Consumer not initialized; cannot poll")
+            return []
+        batch = []
+        try:
+            self._fill(batch, max_records, max_wait_ms)
+        except Exception as e:
+            logger.error(f"KafkaConsumer poll error: {e}")
+        return batch
+
+    def _fill(self, batch: List, max_records: int, max_wait_ms: int):
+        deadline = time.monotonic() + max_wait_ms / 1000
+        while len(batch) < max_records:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            polled = self.consumer.poll(timeout_ms=remaining_ms, max_records=max_records - len(batch))
+            for records in polled.values():
+                batch.extend(records)
+
+    def listen_batches(self, max_records: int = 500, max_wait_ms: int = 1000,
+                       yield_empty: bool = False) -> Iterator[List]:
+        """
+        Yield batches of up to max_records messages (waiting at most max_wait_ms to fill one).
+        A batch's offsets are committed when the caller asks for the next one, i.e. only after
+        its processing returned without raising - at-least-once delivery. If processing fails,
+        call rewind(batch) before continuing so the batch is fetched again.
+        Requires enable_auto_commit=False; poll errors are logged and raised, never swallowed.
+        yield_empty=True also yields [] when max_wait_ms passes without a message (idle hook).
+        """
+        if not self.consumer:
+            logger.error("Consumer not initialized; cannot listen")
+            return
+        if self.enable_auto_commit:
+            raise ValueError("listen_batches needs a Consumer created with enable_auto_commit=False")
+        while self.consumer is not None:
+            batch = []
+            try:
+                self._fill(batch, max_records, max_wait_ms)
+            except Exception:
+                logger.exception("KafkaConsumer poll error")
+                raise
+            if not batch and not yield_empty:
+                continue
+            yield batch
+            if batch and not self._rewound:
+                self.commit(batch)
+            self._rewound = False
+
+    def commit(self, batch: List) -> bool:
+        """Synchronously commit the position after the last message of every partition in batch."""
+        positions = {}
+        for msg in batch:
+            tp = TopicPartition(msg.topic, msg.partition)
+            positions[tp] = max(positions.get(tp, 0), msg.offset + 1)
+        return self.commit_offsets(positions)
+
+    def commit_offsets(self, positions: Dict[TopicPartition, int]) -> bool:
+        """Synchronously commit {partition: next offset to read}."""
+        if not positions:
+            return True
+        try:
+            self.consumer.commit({tp: OffsetAndMetadata(offset, "", -1) for tp, offset in positions.items()})
+            logger.debug("KafkaConsumer committed %s", positions)
+            return True
+        except CommitFailedError as e:
+            # the group rebalanced; the new owner re-reads from the last commit
+            logger.warning(f"KafkaConsumer commit rejected (rebalance), messages will be redelivered: {e}")
+        except Exception as e:
+            logger.error(f"KafkaConsumer commit error: {e}")
+        return False
+
+    def rewind(self, batch: List):
+        """Seek every partition of batch back to its first message, so the next poll redelivers it."""
+        first = {}
+        for msg in batch:
+            tp = TopicPartition(msg.topic, msg.partition)
+            first[tp] = min(first.get(tp, msg.offset), msg.offset)
+        self.seek(first)
+        self._rewound = True
+        logger.warning(f"KafkaConsumer rewound {len(batch)} messages for redelivery")
+
+    def seek(self, positions: Dict[TopicPartition, int]):
+        """Move the fetch position of the (still assigned) partitions; the next poll reads from there."""
+        assigned = self.consumer.assignment()
+        for tp, offset in positions.items():
+            if tp in assigned:
+                self.consumer.seek(tp, offset)
+
+    # ---------- offsets ----------
+    def partitions(self, topic: str) -> List[TopicPartition]:
+        return [TopicPartition(topic, p) for p in sorted(self.consumer.partitions_for_topic(topic) or [])]
+
+    def end_offsets(self, topic: str) -> Dict[TopicPartition, int]:
+        return self.consumer.end_offsets(self.partitions(topic))
+
+    def committed_offsets(self, topic: str) -> Dict[TopicPartition, int]:
+        """Group's committed position per partition (beginning of the log if nothing committed yet)."""
+        partitions = self.partitions(topic)
+        beginning = self.consumer.beginning_offsets(partitions)
+        committed = {}
+        for tp in partitions:
+            offset = self.consumer.committed(tp)
+            committed[tp] = offset if offset is not None else beginning[tp]
+        return committed
+
+    def read_range(self, start: Dict[TopicPartition, int], end: Dict[TopicPartition, int]) -> Iterator:
+        """Yield messages in [start, end) per partition with a throwaway group-less consumer."""
+        pending = {tp: offset for tp, offset in end.items() if start.get(tp, offset) < offset}
+        if not pending:
+            return
+        reader = KafkaConsumer(bootstrap_servers=self.brokers, group_id=None, enable_auto_commit=False,
+                               value_deserializer=_value_deserializer, key_deserializer=_key_deserializer)
+        try:
+            reader.assign(list(pending))
+            for tp in pending:
+                reader.seek(tp, start[tp])
+            while pending:
+                for tp, records in reader.poll(timeout_ms=1000).items():
+                    for msg in records:
+                        if tp in pending and msg.offset < pending[tp]:
+                            yield msg
+                    if tp in pending and reader.position(tp) >= pending[tp]:
+                        del pending[tp]
+        finally:
+            reader.close()
+
     def close(self):
         if not self.consumer:
             return
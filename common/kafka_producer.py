@@ -2,21 +2,37 @@
 from kafka import KafkaProducer
 from kafka.errors import NoBrokersAvailable
 import json
-from typing import Optional, Sequence, Tuple
+from typing import Callable, Optional, Sequence, Tuple
 from common.logger import Logger
 from common.config import settings
 
 logger = Logger.get_logger(name=__name__)
 
 class Producer:
-    def __init__(self, bootstrap_servers: Optional[str] = None):
+    def __init__(
+        self,
+        bootstrap_servers: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        linger_ms: Optional[int] = None,
+        compression_type: Optional[str] = None,
+        buffer_memory: Optional[int] = None,
+        max_block_ms: Optional[int] = None,
+    ):
         self.producer: Optional[KafkaProducer] = None
+        self.delivered = 0
+        self.failed = 0
         brokers = bootstrap_servers or settings.KAFKA_BROKERS
         try:
             self.producer = KafkaProducer(
                 bootstrap_servers=brokers,
                 value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode("utf-8"),
                 key_serializer=lambda k: str(k).encode("utf-8") if k is not None else None,
+                batch_size=batch_size or settings.KAFKA_PRODUCER_BATCH_SIZE,
+                linger_ms=linger_ms if linger_ms is not None else settings.KAFKA_PRODUCER_LINGER_MS,
+                compression_type=compression_type or settings.KAFKA_PRODUCER_COMPRESSION or None,
+                # a full buffer blocks send() for at most max_block_ms, then fails - bounded backpressure
+                buffer_memory=buffer_memory or settings.KAFKA_PRODUCER_BUFFER_MEMORY,
+                max_block_ms=max_block_ms or settings.KAFKA_PRODUCER_MAX_BLOCK_MS,
             )
             logger.info(f"KafkaProducer initialized (brokers={brokers})")
         except NoBrokersAvailable:
@@ -36,21 +52,80 @@ class Producer:
         headers: Optional[Sequence[Tuple[str, bytes]]] = None,
         timeout: float = 10.0,
     ) -> bool:
+        """Blocking send: waits for the broker ack of this one message."""
         if not self.producer:
             logger.error("Producer not initialized; message not sent")
             return False
         try:
             fut = self.producer.send(topic, key=key, value=value, headers=headers or [])
-            md = fut.get()
-            print( f"Kafka → topic={md.topic} partition={md.partition} offset={md.offset}")
-            logger.info(
-                f"Kafka → topic={md.topic} partition={md.partition} offset={md.offset}"
-            )
+            md = fut.get(timeout=timeout)
+            logger.debug("Kafka → topic=%s partition=%s offset=%s", md.topic, md.partition, md.offset)
+            return True
+        except Exception as e:
+            logger.error(f"Kafka send error (topic={topic}): {e}")
+            return False
+
+    def send_async(
+        self,
+        topic: str,
+        value: dict,
+        key: Optional[str | int] = None,
+        headers: Optional[Sequence[Tuple[str, bytes]]] = None,
+        on_success: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+    ) -> bool:
+        """
+        Queue a message and return at once; the outcome is reported from the producer's I/O thread
+        through on_success(record_metadata) / on_error(exception). Returns False only if the
+        message could not even be queued (not initialized, or buffer still full after max_block_ms).
+        """
+        if not self.producer:
+            logger.error("Producer not initialized; message not sent")
+            return False
+        try:
+            fut = self.producer.send(topic, key=key, value=value, headers=headers or [])
+            fut.add_callback(self._delivered, on_success)
+            fut.add_errback(self._failed, topic, on_error)
             return True
         except Exception as e:
+            self.failed += 1
             logger.error(f"Kafka send error (topic={topic}): {e}")
             return False
 
+    def _delivered(self, on_success: Optional[Callable], md):
+        self.delivered += 1
+        logger.debug("Kafka → topic=%s partition=%s offset=%s", md.topic, md.partition, md.offset)
+        if on_success:
+            on_success(md)
+
+    def _failed(self, topic: str, on_error: Optional[Callable], exc):
+        self.failed += 1
+        logger.error(f"Kafka delivery failed (topic={topic}): {exc}")
+        if on_error:
+            on_error(exc)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is acknowledged; the producer stays open."""
+        if not self.producer:
+            return False
+        try:
+            self.producer.flush(timeout=timeout)
+            return True
+        except Exception as e:
+            logger.error(f"KafkaProducer flush error: {e}")
+            return False
+
+    def close(self, timeout: Optional[float] = None):
+        if not self.producer:
+            return
+        try:
+            self.producer.close(timeout=timeout)
+            logger.info("KafkaProducer closed")
+        except Exception as e:
+            logger.error(f"KafkaProducer close error: {e}")
+        finally:
+            self.producer = None
+
     def flush_producer(self):
         if not self.producer:
             return
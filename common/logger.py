@@ -1,58 +1,261 @@
 # matchmaking/common/logger.py
 import logging
-from datetime import datetime
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
 from elasticsearch import Elasticsearch
 from .config import settings
 
 
-class Logger:
+class BulkESHandler(logging.Handler):
+    """
+    Ships log records to Elasticsearch without blocking the caller: emit() only appends the
+    record to a bounded in-memory buffer, and a daemon thread sends it with one _bulk request
+    per batch_size records or per flush_interval_ms, whichever comes first.
+    When the buffer is full a record is dropped (the oldest buffered one or the new one,
+    per drop_policy) and counted in `dropped`; logging never waits on the network.
+    """
 
+    def __init__(self, es: Elasticsearch, index: str, batch_size: int = 500, flush_interval_ms: int = 1000,
+                 buffer_size: int = 10_000, drop_policy: str = "drop_oldest"):
+        super().__init__()
+        if drop_policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"unknown drop_policy {drop_policy!r}")
+        self.es = es
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.buffer_size = buffer_size
+        self.drop_policy = drop_policy
+        self.shipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._shipper = threading.Thread(target=self._run, name="es-log-shipper", daemon=True)
+        self._shipper.start()
 
-    _logger = None
+    def emit(self, record: logging.LogRecord):
+        try:
+            doc = {
+                "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+        except Exception:
+            self.handleError(record)
+            return
+        with self._cond:
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                if self.drop_policy == "drop_newest":
+                    return
+                self._buffer.popleft()
+            self._buffer.append(doc)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
 
-    @classmethod
-    def get_logger(cls, name: str = None, level: int = logging.DEBUG):
-        if cls._logger:
-            return cls._logger
+    def _take(self):
+        with self._cond:
+            if len(self._buffer) < self.batch_size and not self._closed:
+                self._cond.wait(self.flush_interval)
+            return [self._buffer.popleft() for _ in range(min(len(self._buffer), self.batch_size))]
 
-        logger_name = name or settings.SERVICE_NAME or "app"
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(level)
+    def _run(self):
+        while True:
+            batch = self._take()
+            if batch:
+                self._ship(batch)
+            elif self._closed:
+                return
 
-        if not logger.handlers:
+    def _ship(self, batch):
+        operations = []
+        for doc in batch:
+            operations.append({"index": {"_index": self.index}})
+            operations.append(doc)
+        try:
+            resp = self.es.bulk(operations=operations)
+            failed = sum(1 for item in resp["items"] if item["index"].get("error")) if resp.get("errors") else 0
+            self.shipped += len(batch) - failed
+            self.failed += failed
+        except Exception as e:
+            self.failed += len(batch)
+            # not through logging: this handler would feed its own failure back into the buffer
+            print(f"ES log shipping failed ({len(batch)} records): {e}", file=sys.stderr)
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "shipped": self.shipped,
+                "dropped": self.dropped, "failed": self.failed}
+
+    def flush(self):
+        with self._cond:
+            self._cond.notify()
+
+    def close(self):
+        """Called by logging.shutdown at exit: ship what is buffered, waiting at most a few seconds."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._shipper.join(timeout=5)
+        super().close()
+
+
+REDACTED_FIELDS = ("photo", "password")
+VECTOR_SUFFIXES = ("_vector", "vectors")
+
+
+def compact(value, max_chars: int = None):
+    """
+    Copy of value that is cheap and safe to log: photo/password fields and embedding vectors
+    are replaced by a short summary, other long strings are truncated to max_chars.
+    """
+    max_chars = max_chars or settings.LOG_MAX_FIELD_CHARS
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if key in REDACTED_FIELDS:
+                out[key] = f"<{key}: {len(item)} chars>" if isinstance(item, (str, bytes)) else (
+                    "<redacted>" if item is not None else None)
+            elif isinstance(key, str) and key.endswith(VECTOR_SUFFIXES) and isinstance(item, (list, tuple)):
+                out[key] = f"<vector: {len(item)} values>"
+            else:
+                out[key] = compact(item, max_chars)
+        return out
+    if isinstance(value, (list, tuple)):
+        if len(value) > 20:
+            return [compact(v, max_chars) for v in value[:20]] + [f"... {len(value) - 20} more"]
+        return [compact(v, max_chars) for v in value]
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:max_chars]}... ({len(value)} chars)"
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return value
+
+
+class Lazy:
+    """Log argument rendered only if a handler actually formats the record."""
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+    __repr__ = __str__
+
+
+def payload(value) -> Lazy:
+    """logger.info("Received %s", payload(msg.value)) - compacted and formatted lazily."""
+    return Lazy(compact, value)
+
+
+def fields(**kwargs) -> Lazy:
+    """logger.info("feedback %s", fields(actor=a, status=s)) renders as 'actor=... status=...'."""
+    return Lazy(lambda: " ".join(f"{k}={compact(v)}" for k, v in kwargs.items()))
+
+
+class Sampler:
+    """
+    Lets 1 in `every` calls per key through, for logs written once per message on hot paths.
+    Counters are not locked: under threads the sampling rate is approximate, never blocking.
+    """
+
+    def __init__(self, every: int = None):
+        self.every = every or settings.LOG_SAMPLE_EVERY
+        self._counts = {}
+
+    def log(self, logger: logging.Logger, level: int, msg: str, *args, key: str = None):
+        if not logger.isEnabledFor(level):
+            return
+        key = key or msg
+        seen = self._counts.get(key, 0) + 1
+        self._counts[key] = seen
+        if (seen - 1) % self.every:
+            return
+        logger.log(level, f"{msg} [sampled 1/{self.every}, seen {seen}]", *args, stacklevel=2)
+
+
+def _parse_levels(spec: str):
+    levels = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            prefix, level = part.split("=", 1)
+            levels[prefix.strip()] = level.strip().upper()
+    return levels
+
+
+class Logger:
+    """
+    One logger per module name, all sharing the same handlers (stderr, plus the ES shipper
+    outside dev). Levels default to LOG_LEVEL; LOG_LEVELS / set_level override them per
+    dotted-name prefix, so a hot module can be turned down without silencing the rest.
+    """
+
+    _loggers = {}
+    _handlers = None
+    _levels = _parse_levels(settings.LOG_LEVELS)
+
+    @classmethod
+    def _shared_handlers(cls):
+        if cls._handlers is None:
             stream_handler = logging.StreamHandler()
             formatter = logging.Formatter(
                 fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
             stream_handler.setFormatter(formatter)
-            logger.addHandler(stream_handler)
-
+            cls._handlers = [stream_handler]
 
             if settings.APP_ENV != "dev":
                 try:
-                    es = Elasticsearch(str(settings.ES_URL))
-                    es_index = getattr(settings, "ES_INDEX_LOGGER", "logs")
-
-                    class ESHandler(logging.Handler):
-                        def emit(self, record):
-                            try:
-                                es.index(
-                                    index=es_index,
-                                    document={
-                                        "timestamp": datetime.utcnow().isoformat(),
-                                        "level": record.levelname,
-                                        "logger": record.name,
-                                        "message": record.getMessage(),
-                                    },
-                                )
-                            except Exception as e:
-                                print(f"ES log failed: {e}")
-
-                    logger.addHandler(ESHandler())
+                    cls._handlers.append(BulkESHandler(
+                        Elasticsearch(str(settings.ES_URL)),
+                        settings.ES_INDEX_LOGGER,
+                        batch_size=settings.LOG_SHIP_BATCH_SIZE,
+                        flush_interval_ms=settings.LOG_SHIP_FLUSH_INTERVAL_MS,
+                        buffer_size=settings.LOG_SHIP_BUFFER_SIZE,
+                        drop_policy=settings.LOG_SHIP_DROP_POLICY,
+                    ))
                 except Exception as e:
                     print(f"[Logger] Failed to connect to Elasticsearch: {e}")
+        return cls._handlers
+
+    @classmethod
+    def level_for(cls, name: str) -> str:
+        """Level of the longest LOG_LEVELS prefix matching name, else LOG_LEVEL."""
+        best = None
+        for prefix in cls._levels:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return cls._levels[best] if best else settings.LOG_LEVEL.upper()
+
+    @classmethod
+    def set_level(cls, prefix: str, level: str):
+        """Runtime override for every logger named prefix or prefix.*"""
+        cls._levels[prefix] = level.upper()
+        for name, logger in cls._loggers.items():
+            logger.setLevel(cls.level_for(name))
 
-            cls._logger = logger
+    @classmethod
+    def get_logger(cls, name: str = None, level: int = None):
+        logger_name = name or settings.SERVICE_NAME or "app"
+        logger = cls._loggers.get(logger_name)
+        if logger:
+            return logger
+
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(level if level is not None else cls.level_for(logger_name))
+        # handlers live here, so don't also hand records to whatever the root logger has
+        logger.propagate = False
+        if not logger.handlers:
+            for handler in cls._shared_handlers():
+                logger.addHandler(handler)
 
+        cls._loggers[logger_name] = logger
         return logger
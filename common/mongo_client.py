@@ -1,14 +1,24 @@
 # matchmaking/common/mongo_client.py
 from pymongo import MongoClient
 from pymongo.collection import Collection
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from common.config import settings
-from common.logger import Logger
+from common.logger import Logger, payload
 
 
 logger = Logger.get_logger(name=__name__)
 
 
+def pool_options() -> Dict[str, Any]:
+    """Connection-pool keyword arguments shared by the sync and async Mongo clients."""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxConnecting": settings.MONGO_MAX_CONNECTING,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    }
+
+
 class MongoConnection:
     """Simple wrapper around pymongo for our services, with robust logging & error handling."""
 
@@ -23,7 +33,7 @@ class MongoConnection:
         if self._client is not None:
             return self._db
         try:
-            self._client = MongoClient(self._uri)
+            self._client = MongoClient(self._uri, **pool_options())
             self._db = self._client[self._db_name]
             logger.info(f"Connected to MongoDB at {self._uri}, db={self._db_name}")
             return self._db
@@ -35,7 +45,7 @@ class MongoConnection:
         try:
             if self._db is None:
                 self.connect()
-            logger.debug(f"Accessing collection: {name}")
+            logger.debug("Accessing collection: %s", name)
             return self._db[name]
         except Exception as e:
             logger.exception(f"Get collection failed (name={name})")
@@ -69,7 +79,7 @@ class MongoConnection:
         try:
             col = self.get_collection(coll)
             result = col.find_one(query)
-            logger.debug(f"find_one on '{coll}' with query={query} → {bool(result)}")
+            logger.debug("find_one on '%s' with query=%s → %s", coll, payload(query), result is not None)
             return result
         except Exception as e:
             logger.exception(f"find_one failed (coll={coll}, query={query})")
@@ -95,6 +105,21 @@ class MongoConnection:
             )
             raise RuntimeError(f"update failed ({coll}): {e}") from e
 
+    def bulk_write(self, coll: str, operations: List[Any], ordered: bool = False):
+        if not operations:
+            return None
+        try:
+            col = self.get_collection(coll)
+            res = col.bulk_write(operations, ordered=ordered)
+            logger.info(
+                f"bulk_write on '{coll}' ({len(operations)} ops: matched={res.matched_count}, "
+                f"modified={res.modified_count}, upserted={res.upserted_count})"
+            )
+            return res
+        except Exception as e:
+            logger.exception(f"bulk_write failed (coll={coll}, ops={len(operations)})")
+            raise RuntimeError(f"bulk_write failed ({coll}): {e}") from e
+
     def close(self):
         try:
             if self._client:
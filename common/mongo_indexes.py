@@ -0,0 +1,89 @@
+# matchmaking/common/mongo_indexes.py
+from typing import Dict, List
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from common.config import settings
+from common.feedback_edges import EDGE_KEY
+from common.logger import Logger
+
+logger = Logger.get_logger(name=__name__)
+
+
+def required_indexes() -> Dict[str, List[IndexModel]]:
+    """
+    Indexes the hot queries need, per collection (_id is always indexed by Mongo):
+      likes    - MongoReader looks a user's document up by profile_id, then tests likes/dislikes
+                 membership on that single document; multikey indexes on the arrays would only
+                 duplicate every edge into the index.
+      feedback_edges - one document per (actor, target); unique, so concurrent upserts of a pair
+                 cannot insert it twice, and the pair lookups of the match engine are point reads.
+      users    - login/register find_one by email; unique, so concurrent registers cannot both insert.
+      profiles / candidates - read by _id only ($in hydration, per-user candidates document).
+    """
+    return {
+        settings.MONGO_COLL_LIKES: [
+            IndexModel([(settings.PROFILE_ID_FIELD, ASCENDING)], name="profile_id_1"),
+        ],
+        settings.MONGO_COLL_FEEDBACK_EDGES: [
+            IndexModel(EDGE_KEY, name="actor_id_1_target_id_1", unique=True),
+        ],
+        settings.MONGO_COLL_USERS: [
+            IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        ],
+    }
+
+
+def _conflict(e: OperationFailure) -> bool:
+    # IndexOptionsConflict / IndexKeySpecsConflict: an index of that name or keys exists with other options
+    return e.code in (85, 86)
+
+
+def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create the required indexes on a (sync) pymongo Database. Idempotent: createIndexes is a
+    no-op for indexes that already exist with the same spec. A conflicting existing index is
+    logged and left alone - dropping it is an operator decision.
+    """
+    created = {}
+    for coll, indexes in required_indexes().items():
+        try:
+            created[coll] = db[coll].create_indexes(indexes)
+        except OperationFailure as e:
+            if not _conflict(e):
+                raise
+            logger.error("index on '%s' conflicts with an existing one, left as is: %s", coll, e)
+    logger.info("Mongo indexes ensured: %s", created)
+    return created
+
+
+async def ensure_indexes_async(db) -> Dict[str, List[str]]:
+    """ensure_indexes for an AsyncDatabase (the API's client)."""
+    created = {}
+    for coll, indexes in required_indexes().items():
+        try:
+            created[coll] = await db[coll].create_indexes(indexes)
+        except OperationFailure as e:
+            if not _conflict(e):
+                raise
+            logger.error("index on '%s' conflicts with an existing one, left as is: %s", coll, e)
+    logger.info("Mongo indexes ensured: %s", created)
+    return created
+
+
+def bootstrap_indexes(db):
+    """Service-startup hook: ensure_indexes unless MONGO_ENSURE_INDEXES is off; never fatal."""
+    if not settings.MONGO_ENSURE_INDEXES:
+        return
+    try:
+        ensure_indexes(db)
+    except Exception as e:
+        logger.error(f"Mongo index bootstrap failed, continuing without it: {e}")
+
+
+async def bootstrap_indexes_async(db):
+    if not settings.MONGO_ENSURE_INDEXES:
+        return
+    try:
+        await ensure_indexes_async(db)
+    except Exception as e:
+        logger.error(f"Mongo index bootstrap failed, continuing without it: {e}")
@@ -1,16 +1,21 @@
 from fastapi import FastAPI
+from services.api.dependencies import lifespan
 from services.api.routes.add_a_new_person import router as add_person_router
 from services.api.routes.likes import router as likes_router
 from services.api.routes.login import router as login_router
+from services.api.routes.photos import router as photos_router
+from services.api.routes.stats import router as stats_router
 from services.api.routes.waiting_matches import router as waiting_matches_router
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(add_person_router)
 app.include_router(likes_router)
 app.include_router(login_router)
 app.include_router(waiting_matches_router)
+app.include_router(photos_router)
+app.include_router(stats_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from elasticsearch import Elasticsearch
+from fastapi import FastAPI, Request
+from pymongo.asynchronous.collection import AsyncCollection
+from common.async_mongo_client import AsyncMongoConnection
+from common.blob_store import BlobStore, create_blob_store
+from common.config import settings
+from common.es_client import close_clients, get_client
+from common.kafka_producer import Producer
+from common.logger import Logger
+from common.mongo_indexes import bootstrap_indexes_async
+from services.api.profile_cache import ProfileCacheInvalidator, ProfileSummaryCache
+
+logger = Logger.get_logger(name=__name__)
+
+
+class AppResources:
+    """
+    The API's clients: one async Mongo pool, one Kafka producer and one ES pool for the whole app,
+    plus the profile summary cache shared by the routes.
+    """
+
+    def __init__(self):
+        self.mongo = AsyncMongoConnection()
+        self.producer: Optional[Producer] = None
+        self.es: Optional[Elasticsearch] = None
+        self.photos: Optional[BlobStore] = None
+        self.profile_cache: Optional[ProfileSummaryCache] = None
+        self.cache_invalidator: Optional[ProfileCacheInvalidator] = None
+
+    def start(self):
+        self.mongo.connect()
+        self.producer = Producer()
+        self.photos = create_blob_store()
+        self.profile_cache = ProfileSummaryCache(self.mongo.get_collection(settings.MONGO_COLL_PROFILESS))
+        self.cache_invalidator = ProfileCacheInvalidator(self.profile_cache)
+        self.cache_invalidator.start()
+        try:
+            self.es = get_client(settings.ES_URL)
+        except Exception as e:
+            logger.warning(f"Elasticsearch unavailable at startup, continuing without it: {e}")
+        logger.info("API resources ready")
+
+    async def close(self):
+        if self.cache_invalidator:
+            self.cache_invalidator.close()
+        if self.producer:
+            self.producer.flush(timeout=10)
+            self.producer.close()
+        await self.mongo.close()
+        close_clients()
+        logger.info("API resources closed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    resources = AppResources()
+    resources.start()
+    await bootstrap_indexes_async(resources.mongo.connect())
+    app.state.resources = resources
+    try:
+        yield
+    finally:
+        await resources.close()
+
+
+def get_resources(request: Request) -> AppResources:
+    return request.app.state.resources
+
+
+def get_mongo(request: Request) -> AsyncMongoConnection:
+    return get_resources(request).mongo
+
+
+def get_producer(request: Request) -> Producer:
+    return get_resources(request).producer
+
+
+def get_photo_store(request: Request) -> BlobStore:
+    return get_resources(request).photos
+
+
+def get_profile_cache(request: Request) -> ProfileSummaryCache:
+    return get_resources(request).profile_cache
+
+
+def get_likes_collection(request: Request) -> AsyncCollection:
+    return get_mongo(request).get_collection(settings.MONGO_COLLECTION_LIKES)
+
+
+def get_feedback_edges_collection(request: Request) -> AsyncCollection:
+    return get_mongo(request).get_collection(settings.MONGO_COLL_FEEDBACK_EDGES)
+
+
+def get_candidates_collection(request: Request) -> AsyncCollection:
+    return get_mongo(request).get_collection(settings.MONGO_COLL_CANDIDATES)
+
+
+def get_profiles_collection(request: Request) -> AsyncCollection:
+    return get_mongo(request).get_collection(settings.MONGO_COLL_PROFILESS)
+
+
+def get_users_collection(request: Request) -> AsyncCollection:
+    return get_mongo(request).get_collection(settings.MONGO_COLL_USERS)
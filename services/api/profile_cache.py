@@ -0,0 +1,183 @@
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo.asynchronous.collection import AsyncCollection
+from common.config import settings
+from common.kafka_consumer import Consumer
+from common.logger import Logger
+
+logger = Logger.get_logger(name=__name__)
+
+SUMMARY_PROJECTION = {"_id": 1, "first_name": 1, "last_name": 1, "age": 1, "gender": 1, "location": 1}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class ProfileSummaryCache:
+    """
+    Read-through LRU/TTL cache of profile summaries (SUMMARY_PROJECTION) shared by the API routes.
+    get_many serves what it can from memory and loads all misses with one $in query.
+    Entries leave on TTL, on LRU eviction, or when invalidate() is called for a profile that was
+    created/updated (ProfileCacheInvalidator), so a summary is never older than the TTL.
+    Used from the event loop and the invalidation thread, hence the (short-held) lock.
+    """
+
+    def __init__(self, collection: AsyncCollection, max_entries: Optional[int] = None,
+                 ttl_s: Optional[float] = None, latency_window: Optional[int] = None):
+        self.collection = collection
+        self.max_entries = settings.PROFILE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_s = settings.PROFILE_CACHE_TTL_S if ttl_s is None else ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # invalidations that race a load: id -> epoch, so a value read before the update is not cached
+        self._epoch = 0
+        self._loading: Dict[str, int] = {}
+        self._stale: Dict[str, int] = {}
+        self._latencies_ms = deque(maxlen=latency_window or settings.PROFILE_CACHE_LATENCY_WINDOW)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get(self, profile_id: str, now: float) -> Optional[dict]:
+        entry = self._entries.get(profile_id)
+        if entry is None:
+            return None
+        expires_at, summary = entry
+        if expires_at <= now:
+            del self._entries[profile_id]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(profile_id)
+        return summary
+
+    def _put(self, profile_id: str, summary: dict, now: float):
+        self._entries[profile_id] = (now + self.ttl_s, summary)
+        self._entries.move_to_end(profile_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_many(self, profile_ids: Iterable[str]) -> Dict[str, dict]:
+        """{id: summary} for the ids that exist; unknown ids are simply absent."""
+        start = time.perf_counter()
+        found: Dict[str, dict] = {}
+        missing: List[str] = []
+        with self._lock:
+            now = time.monotonic()
+            for profile_id in dict.fromkeys(profile_ids):
+                summary = self._get(profile_id, now)
+                if summary is None:
+                    missing.append(profile_id)
+                else:
+                    found[profile_id] = summary
+            self.hits += len(found)
+            self.misses += len(missing)
+            for profile_id in missing:
+                self._loading[profile_id] = self._loading.get(profile_id, 0) + 1
+            epoch = self._epoch
+
+        if missing:
+            loaded = {}
+            try:
+                async for doc in self.collection.find({"_id": {"$in": missing}}, SUMMARY_PROJECTION):
+                    loaded[doc["_id"]] = {k: v for k, v in doc.items() if k != "_id"}
+            finally:
+                with self._lock:
+                    now = time.monotonic()
+                    for profile_id in missing:
+                        if profile_id in loaded and self._stale.get(profile_id, -1) < epoch and self.max_entries:
+                            self._put(profile_id, loaded[profile_id], now)
+                        self._loading[profile_id] -= 1
+                        if not self._loading[profile_id]:
+                            del self._loading[profile_id]
+                            self._stale.pop(profile_id, None)
+            found.update(loaded)
+
+        self._latencies_ms.append((time.perf_counter() - start) * 1000)
+        return found
+
+    def invalidate(self, profile_ids: Iterable[str]):
+        with self._lock:
+            self._epoch += 1
+            for profile_id in profile_ids:
+                if self._entries.pop(profile_id, None) is not None:
+                    self.invalidations += 1
+                if profile_id in self._loading:
+                    self._stale[profile_id] = self._epoch
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        latencies = list(self._latencies_ms)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "get_many_p50_ms": round(percentile(latencies, 0.5), 3),
+            "get_many_p99_ms": round(percentile(latencies, 0.99), 3),
+            "latency_samples": len(latencies),
+        }
+
+
+class ProfileCacheInvalidator:
+    """
+    Background thread evicting cached summaries of profiles seen on the profile create/update
+    topics. Every API process must see every event, so each one reads with its own consumer
+    group from the latest offset; what happened before startup cannot be cached yet anyway.
+    The group never commits: with no stored offsets the broker drops it as soon as the process
+    leaves, so restarts do not pile up one dead group per pid.
+    """
+
+    def __init__(self, cache: ProfileSummaryCache, topics: Optional[List[str]] = None):
+        self.cache = cache
+        self.topics = topics or settings.PROFILE_CACHE_INVALIDATION_TOPICS
+        self.group_id = f"profile_cache-{socket.gethostname()}-{os.getpid()}"
+        self.consumer: Optional[Consumer] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-cache-invalidator", daemon=True)
+
+    def start(self):
+        self.consumer = Consumer(self.topics, self.group_id, auto_offset_reset="latest",
+                                 enable_auto_commit=False)
+        if not self.consumer.ready:
+            logger.warning("profile cache invalidation disabled (no Kafka); entries live up to %ss",
+                           self.cache.ttl_s)
+            return
+        self._thread.start()
+        logger.info("profile cache invalidator listening on %s (group %s)", self.topics, self.group_id)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self.consumer.poll_batch(max_records=500, max_wait_ms=500)
+            ids = [msg.value.get("unique_id") or msg.key for msg in batch if isinstance(msg.value, dict)]
+            ids = [profile_id for profile_id in ids if profile_id]
+            if ids:
+                self.cache.invalidate(ids)
+                logger.debug("profile cache invalidated %d ids", len(ids))
+
+    def close(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+        if self.consumer:
+            self.consumer.close()
@@ -1,20 +1,21 @@
-from fastapi import UploadFile, File, Depends, APIRouter
-from fastapi.responses import JSONResponse
+import json
+import anyio
+from fastapi import UploadFile, File, Depends, APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Literal, List, Optional
-from common.mongo_client import MongoConnection
+from common.async_mongo_client import AsyncMongoConnection
+from common.blob_store import BlobStore, BlobTooLarge
 from common.kafka_producer import Producer
 from common.config import settings
 from common.logger import Logger
-import base64
 import uvicorn
 
+from services.api.dependencies import get_mongo, get_photo_store, get_producer
 from services.tools.create_hash import CreateHash
 
 logger = Logger.get_logger(name=__name__)
-mongo = MongoConnection()
 create_hash = CreateHash()
-producer = Producer()
 
 router = APIRouter(prefix="/add_person",tags=["add_person"])
 database = {}
@@ -38,38 +39,120 @@ class PersonModel(BaseModel):
 
 
 
-async def build_person(person: PersonModel, file: Optional[UploadFile] = File(None)):
+async def build_person(person: PersonModel, photos: BlobStore, file: Optional[UploadFile] = File(None)):
+    """
+    The photo goes to the blob store, chunk by chunk from the spooled upload, and the profile
+    (and its Kafka event) only carries its sha256 reference, served by GET /photos/{ref}.
+    """
     data = person.dict()
-    if file:
-        contents = await file.read()
-        data["photo"] = base64.b64encode(contents).decode("utf-8")
-    else:
-        data["photo"] = None
+    data["photo_ref"] = None
+    if file and file.filename:
+        if file.content_type and not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=415, detail="photo must be an image")
+        try:
+            info = await anyio.to_thread.run_sync(photos.put, file.file, file.content_type or "image/jpeg")
+        except BlobTooLarge:
+            raise HTTPException(status_code=413, detail=f"photo is larger than {photos.max_bytes} bytes")
+        data["photo_ref"] = info.ref
     return data
 
 
 @router.post("/add_person")
-async def add_person(person: PersonModel = Depends(), file: Optional[UploadFile] = File(None)):
-    person_data = await build_person(person, file)
+async def add_person(person: PersonModel = Depends(), file: Optional[UploadFile] = File(None),
+                     mongo: AsyncMongoConnection = Depends(get_mongo), producer: Producer = Depends(get_producer),
+                     photos: BlobStore = Depends(get_photo_store)):
+    # a duplicate must be refused before its photo reaches the blob store
     person_id = create_hash.made_a_hash(person.email)
-    if mongo.check_exists_by_id(settings.MONGO_COLL_PROFILESS, person_id):
+    if await mongo.check_exists_by_id(settings.MONGO_COLL_PROFILESS, person_id):
         logger.error(f"error:{person.email} already exists in the system !!!")
         return {"error": f"{person.email} already exists in the system !!!"}
+    person_data = await build_person(person, photos, file)
 
-    logger.info("create a id")
-    mongo.insert(settings.MONGO_COLL_PROFILESS, {"unique_id": person_id, **person_data} ,person_id)
-    logger.info(f"inserted to mongo {settings.MONGO_COLL_PROFILESS} collection :")
+    logger.debug("create a id")
+    await mongo.insert(settings.MONGO_COLL_PROFILESS, {"unique_id": person_id, **person_data} ,person_id)
+    logger.info("inserted %s to mongo %s collection", person_id, settings.MONGO_COLL_PROFILESS)
 
     person_to_kafka = {"unique_id":person_id,**person_data}
-    producer.send_message(settings.TOPIC_PROFILES_CREATEDD,person_to_kafka)
-    logger.info(f"send to kafka in {settings.TOPIC_PROFILES_CREATEDD} topic::")
+    producer.send_async(settings.TOPIC_PROFILES_CREATEDD,person_to_kafka,key=person_id)
+    logger.debug("send to kafka in %s topic", settings.TOPIC_PROFILES_CREATEDD)
     return JSONResponse({"status": "ok", "person_id": person_id})
 
 
+def export_projection(fields: Optional[str]) -> dict:
+    """fields="a,b" keeps only those (plus _id); by default everything except the inline photo."""
+    if not fields:
+        return {"photo": 0}
+    names = [field.strip() for field in fields.split(",") if field.strip()]
+    for name in names:
+        # Mongo rejects these only once the stream has started, so they are refused up front
+        parts = name.split(".")
+        if name.startswith("$") or "" in parts:
+            raise HTTPException(status_code=400, detail=f"invalid field {name!r}")
+        if any(".".join(parts[:i]) in names for i in range(1, len(parts))):
+            raise HTTPException(status_code=400, detail=f"field {name!r} overlaps a parent field")
+    return dict.fromkeys(names, 1)
+
+
+def export_query(after_id: Optional[str], gender: Optional[str], location: Optional[str], sector: Optional[str],
+                 min_age: Optional[int], max_age: Optional[int]) -> dict:
+    query = {k: v for k, v in (("gender", gender), ("location", location), ("sector", sector)) if v}
+    if min_age is not None or max_age is not None:
+        query["age"] = {k: v for k, v in (("$gte", min_age), ("$lte", max_age)) if v is not None}
+    if after_id:
+        query["_id"] = {"$gt": after_id}
+    return query
+
+
+async def ndjson_lines(cursor, chunk_bytes: int):
+    """
+    One JSON document per line, sent in chunks of about chunk_bytes. Documents are pulled from
+    the server-side cursor batch by batch as the client reads, so memory stays constant.
+    """
+    buffer, size, count, last_id = [], 0, 0, None
+    try:
+        async for doc in cursor:
+            line = json.dumps(doc, default=str, ensure_ascii=False) + "\n"
+            buffer.append(line)
+            size += len(line)
+            count += 1
+            last_id = doc["_id"]
+            if size >= chunk_bytes:
+                yield "".join(buffer).encode("utf-8")
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+        logger.info("exported %d profiles (last _id %s)", count, last_id)
+    except Exception as e:
+        # the status line is already sent: flush the complete lines, then re-raise so the server
+        # aborts the response instead of ending it cleanly. The client sees a truncated body and
+        # resumes with after_id=<last _id it received>.
+        logger.error(f"profile export failed after {count} profiles (last _id {last_id}): {e}")
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+        raise
+    finally:
+        await cursor.close()
+
+
 @router.get("/people")
-def get_people():
-    all_collection = mongo.get_collection(settings.MONGO_COLL_PROFILESS)
-    return all_collection
+async def get_people(fields: Optional[str] = None, after_id: Optional[str] = None,
+                     gender: Optional[Literal["Male", "Female"]] = None, location: Optional[str] = None,
+                     sector: Optional[str] = None, min_age: Optional[int] = None, max_age: Optional[int] = None,
+                     limit: Optional[int] = Query(None, ge=1),
+                     mongo: AsyncMongoConnection = Depends(get_mongo)):
+    """
+    NDJSON export of profiles in _id order. To resume an interrupted export, repeat the request
+    with after_id set to the last _id received.
+    """
+    cursor = mongo.get_collection(settings.MONGO_COLL_PROFILESS).find(
+        export_query(after_id, gender, location, sector, min_age, max_age),
+        export_projection(fields),
+        sort=[("_id", 1)],
+        limit=limit or 0,
+        batch_size=settings.PROFILE_EXPORT_BATCH_SIZE,
+    )
+    return StreamingResponse(ndjson_lines(cursor, settings.PROFILE_EXPORT_CHUNK_BYTES),
+                             media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
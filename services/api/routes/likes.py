@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from pymongo.asynchronous.collection import AsyncCollection
 from common.config import settings
+from common.feedback_edges import FEEDBACK_STATUSES, edge_filter, edge_update, edges_mode
 from common.logger import Logger
 from pydantic import BaseModel
 from typing import Literal
-from common.mongo_client import mongo
 from common.kafka_producer import Producer
+from services.api.dependencies import (get_candidates_collection, get_feedback_edges_collection,
+                                       get_likes_collection, get_producer)
 
 logger = Logger.get_logger(name=__name__)
 router = APIRouter(prefix="/likes",tags=["likes"])
-producer = Producer()
-feedback_collection = mongo.get_collection(settings.MONGO_COLLECTION_LIKES)
 KAFKA_TOPIC = settings.TOPIC_FEEDBACKS
 
 class Feedback(BaseModel):
@@ -18,30 +20,44 @@ class Feedback(BaseModel):
     status: Literal["likes", "dislikes", "waiting"]
 
 @router.post("/feedback")
-def save_feedback(feedback: Feedback):
+async def save_feedback(feedback: Feedback,
+                        feedback_collection: AsyncCollection = Depends(get_likes_collection),
+                        edges_collection: AsyncCollection = Depends(get_feedback_edges_collection),
+                        candidates_collection: AsyncCollection = Depends(get_candidates_collection),
+                        producer: Producer = Depends(get_producer)):
     try:
-        statuses = ["likes", "dislikes", "waiting"]
-        others = [s for s in statuses if s != feedback.status]
-        update_query = {"$addToSet": {feedback.status: feedback.target_id},
-                        "$pull": {s: feedback.target_id for s in others}}
+        if edges_mode():
+            # one small document per pair instead of rewriting the actor's ever-growing arrays
+            result = await edges_collection.update_one(
+                edge_filter(feedback.actor_id, feedback.target_id),
+                edge_update(feedback.status, datetime.now(timezone.utc)), upsert=True)
+        else:
+            others = [s for s in FEEDBACK_STATUSES if s != feedback.status]
+            update_query = {"$addToSet": {feedback.status: feedback.target_id},
+                            "$pull": {s: feedback.target_id for s in others},
+                            # MongoReader finds the document by profile_id
+                            "$setOnInsert": {settings.PROFILE_ID_FIELD: feedback.actor_id}}
 
-        result = feedback_collection.update_one(
-            {"_id": feedback.actor_id},update_query,upsert=True)
+            result = await feedback_collection.update_one(
+                {"_id": feedback.actor_id},update_query,upsert=True)
+        if feedback.status != "waiting":
+            # answered candidates leave the actor's waiting list
+            await candidates_collection.update_one({"_id": feedback.actor_id},
+                                                   {"$pull": {"candidates": {"id": feedback.target_id}}})
         refund = {
             "status": "success",
             "matched_count": result.matched_count,
             "modified_count": result.modified_count
         }
-        logger.info(f"The update of {feedback.actor_id} was successful:{refund}")
+        logger.debug("The update of %s was successful: %s", feedback.actor_id, refund)
         try:
             kafka_message = {
                 "actor_id": feedback.actor_id,
                 "target_id": feedback.target_id,
                 "status": feedback.status
             }
-            producer.send_message(topic=KAFKA_TOPIC, value=kafka_message)
-            producer.flush_producer()
-            logger.info(f"Sent feedback to Kafka topic {KAFKA_TOPIC}: {kafka_message}")
+            producer.send_async(topic=KAFKA_TOPIC, value=kafka_message, key=feedback.actor_id)
+            logger.debug("Sent feedback to Kafka topic %s: %s", KAFKA_TOPIC, kafka_message)
         except Exception as e:
             logger.error(f"Error sending feedback to Kafka: {e}")
 
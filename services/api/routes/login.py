@@ -1,18 +1,15 @@
-from fastapi import HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter
 from pydantic import BaseModel
-from pymongo import MongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 import uvicorn
 
-from common.config import settings
+from services.api.dependencies import get_users_collection
 
 router = APIRouter(prefix="/login",tags=["login"])
 
-client = MongoClient(settings.MONGO_URI)
-db = client[settings.MONGO_DB]
-users = db["users"]
-
 SECRET_KEY = "mysecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -35,8 +32,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 @router.post("/login")
-def login(data: UserRequest):
-    user = users.find_one({"email": data.email})
+async def login(data: UserRequest, users: AsyncCollection = Depends(get_users_collection)):
+    user = await users.find_one({"email": data.email})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if user["password"] != data.password:
@@ -50,12 +47,16 @@ def login(data: UserRequest):
 
 
 @router.post("/register")
-def register(data: UserRequest):
-    user = users.find_one({"email": data.email})
+async def register(data: UserRequest, users: AsyncCollection = Depends(get_users_collection)):
+    user = await users.find_one({"email": data.email})
     if user:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    users.insert_one({"email": data.email, "password": data.password})
+    try:
+        await users.insert_one({"email": data.email, "password": data.password})
+    except DuplicateKeyError:
+        # a concurrent register of the same email won the unique email index
+        raise HTTPException(status_code=400, detail="User already exists")
     return {"message": f"User {data.email} registered successfully!"}
 
 
@@ -0,0 +1,31 @@
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from common.blob_store import BlobStore, valid_ref
+from common.config import settings
+from common.logger import Logger
+from services.api.dependencies import get_photo_store
+
+logger = Logger.get_logger(name=__name__)
+router = APIRouter(prefix="/photos", tags=["photos"])
+
+
+@router.get("/{photo_ref}")
+async def get_photo(photo_ref: str, request: Request, photos: BlobStore = Depends(get_photo_store)):
+    """Photos are content-addressed: the ref is the ETag and the bytes behind it never change."""
+    if not valid_ref(photo_ref):
+        raise HTTPException(status_code=404, detail="Photo not found")
+    etag = f'"{photo_ref}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.PHOTO_CACHE_MAX_AGE_S}, immutable",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    opened = await anyio.to_thread.run_sync(photos.open, photo_ref)
+    if opened is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    info, chunks = opened
+    headers["Content-Length"] = str(info.size)
+    return StreamingResponse(chunks, media_type=info.content_type, headers=headers)
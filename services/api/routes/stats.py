@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from services.api.dependencies import get_profile_cache
+from services.api.profile_cache import ProfileSummaryCache
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/profile_cache")
+async def profile_cache_stats(profile_cache: ProfileSummaryCache = Depends(get_profile_cache)):
+    """Hit rate, evictions/invalidations and get_many latency percentiles of this API process."""
+    return profile_cache.stats()
@@ -1,34 +1,79 @@
-from fastapi import APIRouter, HTTPException
-from common.mongo_client import mongo
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pymongo.asynchronous.collection import AsyncCollection
 from common.config import settings
 from common.logger import Logger
+from services.api.dependencies import get_candidates_collection, get_profile_cache
+from services.api.profile_cache import ProfileSummaryCache
 
 logger = Logger.get_logger(name=__name__)
 router = APIRouter(prefix="/waiting_matches", tags=["waiting_matches"])
 
-feedback_collection = mongo.get_collection(settings.MONGO_COLLECTION_LIKES)
-profiles_collection = mongo.get_collection(settings.MONGO_COLL_PROFILESS)
+
+def encode_cursor(candidate: dict) -> str:
+    raw = json.dumps([candidate["score"], candidate["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(score, id) of the last candidate of the previous page."""
+    try:
+        score, cand_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(score), str(cand_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_pipeline(actor_id: str, limit: int, after: Optional[tuple]) -> list:
+    """
+    One page of the actor's candidates, which the indexer keeps sorted (score desc, id asc):
+    entries after the cursor, cut to limit + 1 so we know whether another page exists.
+    """
+    candidates = "$candidates"
+    if after:
+        score, cand_id = after
+        candidates = {"$filter": {"input": "$candidates", "cond": {"$or": [
+            {"$lt": ["$$this.score", score]},
+            {"$and": [{"$eq": ["$$this.score", score]}, {"$gt": ["$$this.id", cand_id]}]},
+        ]}}}
+    return [
+        {"$match": {"_id": actor_id}},
+        {"$project": {"_id": 0, "page": {"$slice": [{"$ifNull": [candidates, []]}, limit + 1]}}},
+    ]
+
 
 @router.get("/{actor_id}")
-def get_waiting_matches(actor_id: str):
+async def get_waiting_matches(actor_id: str,
+                              limit: int = Query(settings.WAITING_MATCHES_PAGE_SIZE, ge=1,
+                                                 le=settings.WAITING_MATCHES_MAX_PAGE_SIZE),
+                              cursor: Optional[str] = None,
+                              candidates_collection: AsyncCollection = Depends(get_candidates_collection),
+                              profile_cache: ProfileSummaryCache = Depends(get_profile_cache)):
+    """Candidates best score first, limit per page; pass next_cursor back as cursor for the next page."""
+    after = decode_cursor(cursor) if cursor else None
     try:
-        user_doc = feedback_collection.find_one({"_id": actor_id}, {"waiting": 1, "_id": 0})
-        if not user_doc:
-            logger.info(f"User {actor_id} not found in feedback collection.")
+        docs = await (await candidates_collection.aggregate(page_pipeline(actor_id, limit, after))).to_list()
+        if not docs:
+            logger.info("User %s has no candidates.", actor_id)
             raise HTTPException(status_code=404, detail="User not found")
-        waiting_ids = user_doc.get("waiting", [])
-        if not waiting_ids:
-            logger.info(f"User {actor_id} has no waiting matches.")
-            return {"waiting": []}
-
-        cursor = profiles_collection.find(
-            {"_id": {"$in": waiting_ids}},
-            {"_id": 1, "first_name": 1, "last_name": 1, "age": 1, "gender": 1, "location": 1})
-        profiles = [{"id":doc["_id"], **{k: v for k, v in doc.items() if k != "_id"}}
-                    for doc in cursor]
-        logger.info(f"Found {len(profiles)} waiting matches for user {actor_id}.")
-        return {"waiting": profiles}
+        page = docs[0]["page"]
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        page = page[:limit]
+        if not page:
+            logger.debug("User %s has no waiting matches.", actor_id)
+            return {"waiting": [], "next_cursor": None}
+
+        summaries = await profile_cache.get_many(c["id"] for c in page)
+        # score order comes from the candidates page; profiles deleted since are skipped
+        profiles = [{"id": c["id"], "score": c["score"], **summaries[c["id"]]} for c in page if c["id"] in summaries]
+        logger.debug("Found %d waiting matches for user %s.", len(profiles), actor_id)
+        return {"waiting": profiles, "next_cursor": next_cursor}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving waiting matches for user {actor_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,105 @@
+import base64
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+from common.blob_store import BlobStore, create_blob_store
+from common.config import settings
+from common.kafka_consumer import Consumer
+from common.kafka_producer import Producer
+from common.logger import Logger
+from common.mongo_client import mongo
+from services.enricher.enrichment import enriched_event, make_thumbnails
+
+logger = Logger.get_logger(name=__name__)
+
+
+class Enricher:
+    """
+    Streaming stage between the API and the indexer: profiles_create -> profiles_enriched.
+    Per batch, thumbnails are rendered in a process pool (Pillow is CPU-bound), stored in the
+    blob store, and a slim event with normalized filter fields and only blob references is
+    published; the same fields are written back to the Mongo profile in one bulk_write.
+    """
+
+    def __init__(self, photos: Optional[BlobStore] = None, pool: Optional[ProcessPoolExecutor] = None):
+        self.photos = photos or create_blob_store()
+        # spawn: workers must not inherit the Kafka/Mongo client threads of this process
+        self.pool = pool or ProcessPoolExecutor(max_workers=settings.ENRICHER_WORKERS or os.cpu_count(),
+                                                mp_context=multiprocessing.get_context("spawn"))
+        self.producer = Producer()
+        self.sizes = settings.ENRICHER_THUMBNAIL_SIZES
+
+    def photo_ref(self, profile: dict) -> Optional[str]:
+        """photo_ref of the profile; inline base64 photos from older API versions are moved to the store here."""
+        if profile.get("photo"):
+            ref = self.photos.put(io.BytesIO(base64.b64decode(profile["photo"])), "image/jpeg").ref
+            profile["photo_ref"] = ref
+            return ref
+        return profile.get("photo_ref")
+
+    def thumbnails(self, profiles: List[dict]) -> List[Dict[int, str]]:
+        futures = {}
+        for i, profile in enumerate(profiles):
+            try:
+                ref = self.photo_ref(profile)
+                photo = self.photos.read(ref) if ref else None
+            except Exception as e:
+                # a malformed legacy photo must not fail (and endlessly retry) the whole batch
+                logger.warning("photo of %s dropped: %s", profile.get("unique_id"), e)
+                profile.pop("photo", None)
+                profile["photo_ref"] = None
+                continue
+            if photo:
+                futures[i] = self.pool.submit(make_thumbnails, photo, self.sizes, settings.ENRICHER_THUMBNAIL_QUALITY)
+
+        results: List[Dict[int, str]] = [{} for _ in profiles]
+        for i, future in futures.items():
+            try:
+                thumbs = future.result()
+            except Exception as e:
+                # an undecodable image must not block the profile; it is indexed without thumbnails
+                logger.warning("thumbnails of %s failed: %s", profiles[i].get("unique_id"), e)
+                continue
+            results[i] = {size: self.photos.put(io.BytesIO(data), "image/jpeg").ref for size, data in thumbs.items()}
+        return results
+
+    def enrich_batch(self, profiles: List[dict]) -> List[dict]:
+        events = [enriched_event(p, thumbs) for p, thumbs in zip(profiles, self.thumbnails(profiles))]
+
+        mongo.bulk_write(settings.MONGO_COLL_PROFILESS, [
+            UpdateOne({"_id": e["unique_id"]},
+                      {"$set": {"photo_ref": e.get("photo_ref"), "photo_thumbs": e["photo_thumbs"],
+                                "location_norm": e["location_norm"], "age_bucket": e["age_bucket"]},
+                       "$unset": {"photo": ""}})
+            for e in events
+        ])
+
+        failed_before = self.producer.failed
+        for event in events:
+            self.producer.send_async(settings.TOPIC_PROFILES_ENRICHED, event, key=event["unique_id"])
+        if not self.producer.flush() or self.producer.failed > failed_before:
+            raise RuntimeError(f"{self.producer.failed - failed_before} enriched events were not delivered")
+        return events
+
+    def run(self):
+        cons = Consumer([settings.TOPIC_PROFILES_CREATEDD], settings.ENRICHER_GROUP_ID, enable_auto_commit=False)
+        logger.info("enricher started: %s -> %s", settings.TOPIC_PROFILES_CREATEDD, settings.TOPIC_PROFILES_ENRICHED)
+        try:
+            for batch in cons.listen_batches(settings.ENRICHER_BATCH_SIZE, settings.ENRICHER_BATCH_WAIT_MS):
+                profiles = [msg.value for msg in batch if isinstance(msg.value, dict) and msg.value.get("unique_id")]
+                try:
+                    start = time.perf_counter()
+                    self.enrich_batch(profiles)
+                    logger.info("enriched %d profiles in %.0f ms", len(profiles), (time.perf_counter() - start) * 1000)
+                except Exception as e:
+                    logger.error("enricher batch of %d failed, retrying: %s", len(batch), e)
+                    cons.rewind(batch)
+                    time.sleep(settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS / 1000)
+        finally:
+            cons.close()
+            self.producer.close()
+            self.pool.shutdown()
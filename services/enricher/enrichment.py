@@ -0,0 +1,79 @@
+import io
+import re
+import unicodedata
+from typing import Dict, List, Optional
+from PIL import Image, ImageOps
+
+# raw profile fields that never travel past the enricher
+DROPPED_FIELDS = ("photo",)
+
+AGE_BUCKETS = ((18, 24), (25, 29), (30, 34), (35, 39), (40, 49), (50, 59))
+
+# spellings seen in the form -> one canonical key per city, so ES term filters match
+LOCATION_ALIASES = {
+    "ירושלים": "jerusalem", "jerusalem": "jerusalem", "yerushalayim": "jerusalem",
+    "בני ברק": "bnei brak", "bnei brak": "bnei brak", "bney brak": "bnei brak", "ב\"ב": "bnei brak",
+    "תל אביב": "tel aviv", "תל אביב יפו": "tel aviv", "tel aviv": "tel aviv", "ת\"א": "tel aviv",
+    "בית שמש": "beit shemesh", "beit shemesh": "beit shemesh", "bet shemesh": "beit shemesh",
+    "מודיעין עילית": "modiin illit", "modiin illit": "modiin illit", "kiryat sefer": "modiin illit",
+    "ביתר עילית": "beitar illit", "beitar illit": "beitar illit", "betar illit": "beitar illit",
+    "אלעד": "elad", "elad": "elad",
+    "פתח תקווה": "petah tikva", "פתח תקוה": "petah tikva", "petah tikva": "petah tikva", "petach tikva": "petah tikva",
+    "חיפה": "haifa", "haifa": "haifa",
+    "אשדוד": "ashdod", "ashdod": "ashdod",
+    "צפת": "safed", "safed": "safed", "tzfat": "safed",
+}
+
+
+def normalize_text(value: str) -> str:
+    """NFKC, casefold, dashes/punctuation to spaces (keeping the Hebrew abbreviation quote), single spaces."""
+    value = unicodedata.normalize("NFKC", value).casefold()
+    value = value.replace("״", '"').replace("׳", "'")
+    value = re.sub(r"[-_,.;:/\\()]+", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def normalize_location(location: Optional[str]) -> Optional[str]:
+    if not location:
+        return None
+    text = normalize_text(location)
+    return LOCATION_ALIASES.get(text, text)
+
+
+def age_bucket(age) -> Optional[str]:
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return None
+    for low, high in AGE_BUCKETS:
+        if low <= age <= high:
+            return f"{low}-{high}"
+    return f"{AGE_BUCKETS[-1][1] + 1}+" if age > AGE_BUCKETS[-1][1] else None
+
+
+def make_thumbnails(photo: bytes, sizes: List[int], quality: int = 85) -> Dict[int, bytes]:
+    """
+    JPEG thumbnails whose longest edge is each of sizes, EXIF rotation applied.
+    Runs in the enricher's process pool, so it only takes and returns picklable bytes.
+    """
+    with Image.open(io.BytesIO(photo)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        thumbs = {}
+        for size in sorted(sizes, reverse=True):
+            # shrink from the previous (larger) thumbnail - cheaper than from the original
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format="JPEG", quality=quality, optimize=True)
+            thumbs[size] = out.getvalue()
+        return thumbs
+
+
+def enriched_event(profile: dict, thumbnails: Dict[int, str]) -> dict:
+    """Slim profiles_enriched payload: the profile minus raw bytes, plus filter fields and thumbnail refs."""
+    event = {k: v for k, v in profile.items() if k not in DROPPED_FIELDS}
+    event["location_norm"] = normalize_location(profile.get("location"))
+    event["age_bucket"] = age_bucket(profile.get("age"))
+    event["photo_thumbs"] = {str(size): ref for size, ref in thumbnails.items()}
+    return event
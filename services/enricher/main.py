@@ -0,0 +1,7 @@
+from services.enricher.enricher import Enricher
+
+def main():
+    Enricher().run()
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
-from sentence_transformers import SentenceTransformer
+import logging
+import time
 from common.config import settings
 from common.kafka_consumer import Consumer
-from common.logger import Logger
-from services.indexer.match_service import match_server
+from common.logger import Logger, Sampler
+from services.indexer.elastic_service import ensure_profile_indices
+from services.indexer.match_service import get_match_backend, match_server, match_server_batch
 from services.indexer.mongo_service import MongoService
 
 mongoService = MongoService()
-model = SentenceTransformer("all-MiniLM-L6-v2")
 logger = Logger.get_logger(name=__name__)
-def consumer(topic:list = [settings.TOPIC_PROFILES_CREATEDD], group_id:str = F'group_{settings.TOPIC_PROFILES_CREATEDD}'):
+sampler = Sampler()
+def consumer(topic:list = [settings.INDEXER_INPUT_TOPIC], group_id:str = F'group_{settings.INDEXER_INPUT_TOPIC}'):
 
-    cons = Consumer(topic , group_id)
+    if settings.MATCH_BACKEND == "elastic":
+        ensure_profile_indices()
+    cons = Consumer(topic , group_id, enable_auto_commit=not settings.INDEXER_BATCH_MODE)
     logger.info(f"start consumer - topic: {topic}")
-    for profile in cons.listen():
-        logger.info(f"start consumer listen - topic: {topic}")
-        match_server(profile.value)
+    if not settings.INDEXER_BATCH_MODE:
+        for profile in cons.listen():
+            sampler.log(logger, logging.INFO, "start consumer listen - topic: %s", topic)
+            match_server(profile.value)
+        return
+
+    # offsets are committed by listen_batches only once a batch is indexed and its matches stored
+    for batch in cons.listen_batches(settings.INDEXER_BATCH_SIZE, settings.INDEXER_BATCH_WAIT_MS, yield_empty=True):
+        if not batch:
+            # burst is over - make its tail searchable
+            get_match_backend().flush()
+            continue
+        logger.info("consumer polled %d profiles - topic: %s", len(batch), topic)
+        try:
+            match_server_batch([msg.value for msg in batch])
+        except Exception as e:
+            logger.error(f"batch of {len(batch)} profiles failed, retrying: {e}")
+            cons.rewind(batch)
+            time.sleep(settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS / 1000)
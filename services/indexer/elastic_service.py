@@ -1,62 +1,194 @@
-from common.es_client import Elastic
+import time
+from typing import Iterable, Optional, Set
+from common.es_client import Elastic, get_client, get_elastic
+from common.es_mappings import (PROFILE_FILTER_MAPPINGS, PROFILE_GENDER_ALIASES, PROFILE_TEMPLATE_NAME,
+                                profile_index_body, profile_index_patterns, versioned_index_name)
 from common.config import settings
 from common.logger import Logger
 
 logger = Logger.get_logger(name=__name__)
 
+RECIPROCAL_SCORE_SCRIPT = """
+    double score1 = cosineSimilarity(params.query_offer_vector, 'text_for_search_vector');
+    double score2 = cosineSimilarity(params.query_search_vector, 'text_self_vector');
+    return score1 + score2 + 1.0;
+"""
+# script_score scores must be >= 0, hence the +1.0; match_search takes it off again
+RECIPROCAL_SCORE_OFFSET = 1.0
+
+
+def build_filter_query(filters: dict = None) -> dict:
+    if not filters:
+        return {"match_all": {}}
+
+    must_filters = []
+    must_not_filters = []
+
+    # must
+    for field, value in filters.get("include", {}).items():
+        if isinstance(value, list):
+            must_filters.append({"terms": {field: value}})
+        elif isinstance(value, dict): # range
+            must_filters.append({"range": {field: value}})
+        else:
+            must_filters.append({"term": {field: value}})
+
+    # not_must
+    for field, value in filters.get("exclude", {}).items():
+        if isinstance(value, list):
+            must_not_filters.append({"terms": {field: value}})
+        elif isinstance(value, dict): # range
+            must_not_filters.append({"range": {field: value}})
+        else:
+            must_not_filters.append({"term": {field: value}})
+
+    return {
+        "bool": {
+            "filter": must_filters,
+            "must_not": must_not_filters
+        }
+    }
+
+
+def ensure_profile_indices():
+    """Template + <gender>_<ES_INDEX_PROFILES> indices behind the male/female aliases (idempotent)."""
+    es = Elastic(settings.ES_URL, create_if_missing=False)
+    es.put_index_template(PROFILE_TEMPLATE_NAME, profile_index_patterns(), profile_index_body())
+    for alias in PROFILE_GENDER_ALIASES:
+        if es.es.indices.exists(index=alias) and not es.alias_indices(alias):
+            logger.warning(f"'{alias}' is a legacy concrete index; run services.tools.reindex_profiles to migrate it")
+            continue
+        es.ensure_alias(alias, versioned_index_name(alias), extra_aliases=[settings.ES_ALIAS_PROFILES])
+        try:
+            # the template only shapes new indices; older ones get the filter fields added in place.
+            # Their existing documents only carry the values after services.tools.reindex_profiles.
+            es.es.indices.put_mapping(index=alias, properties=PROFILE_FILTER_MAPPINGS)
+        except Exception as e:
+            logger.error(f"adding filter fields to '{alias}' failed (reindex it): {e}")
+    es.close()
+
+
+class RefreshScheduler:
+    """
+    INDEXER_REFRESH_POLICY:
+      true     - every write forces a refresh (old behaviour, one tiny segment per profile)
+      wait_for - every write blocks until the next scheduled refresh makes it visible
+      none     - never refresh explicitly; the index refresh_interval decides
+      batch    - writes don't refresh; indices written since the last refresh are refreshed
+                 together before the next match search (before_search), otherwise at most once
+                 per INDEXER_REFRESH_INTERVAL_MS. A profile is only ever matched from the side
+                 indexed later, so that side's search must see every earlier write - including
+                 the opposite-gender profiles of its own micro-batch.
+    """
+
+    def __init__(self, policy: Optional[str] = None, interval_ms: Optional[int] = None):
+        self.policy = policy or settings.INDEXER_REFRESH_POLICY
+        self.interval = (interval_ms if interval_ms is not None else settings.INDEXER_REFRESH_INTERVAL_MS) / 1000
+        self._dirty: Set[str] = set()
+        self._last_refresh = 0.0
+        self.refreshes = 0
+
+    @property
+    def write_refresh(self) -> Optional[str]:
+        return self.policy if self.policy in ("true", "wait_for") else None
+
+    def written(self, indices: Iterable[str]):
+        if self.policy == "batch":
+            self._dirty.update(indices)
+
+    def before_search(self):
+        """One refresh of the dirty indices per written batch, not per profile; no-op once clean."""
+        self.maybe_refresh(force=True)
+
+    def maybe_refresh(self, force: bool = False):
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.interval:
+            return
+        indices = ",".join(sorted(self._dirty))
+        try:
+            get_client(settings.ES_URL).indices.refresh(index=indices)
+            self.refreshes += 1
+            logger.debug(f"refreshed {indices}")
+        except Exception as e:
+            logger.error(f"refresh({indices}) failed: {e}")
+        self._dirty.clear()
+        self._last_refresh = now
+
+
+refresh_scheduler = RefreshScheduler()
+
+_services = {}
+
+
+def get_elastic_service(index_name: str) -> "ElasticService":
+    """One ElasticService per index for the whole process (pooled client, no per-message ping)."""
+    service = _services.get(index_name)
+    if service is None:
+        service = _services[index_name] = ElasticService(index_name)
+    return service
+
+
 class ElasticService:
     def __init__(self, index_name):
         self.index = index_name
-        self.es = Elastic(settings.ES_URL, index_name)
+        self.es = get_elastic(index_name, settings.ES_URL, mapping=profile_index_body())
 
-    def upsert_doc(self, doc_id: str, doc: dict,refresh:str):
+    def upsert_doc(self, doc_id: str, doc: dict,refresh:str = None):
         self.es.upsert_doc(
             doc_id=doc_id,
             doc=doc,
             refresh=refresh
         )
 
-    def match_search(self, doc_id, size: int = 1, filters: dict = None):
-        doc = self.es.get_doc(doc_id)
-        if not doc:
-            logger.warning(f"No document found for id {doc_id} in index {self.index}")
-            return
+    def bulk_upsert(self, docs: list, refresh: str = None) -> bool:
+        """docs = [(index, doc_id, doc), ...]; may span both gender indices."""
+        return self.es.bulk_upsert(docs, refresh=refresh)
 
-        index_gender = "female" if self.index == "male" else "male"
-
-        text_self_vector = doc["text_self_vector"]
-        text_for_search_vector = doc["text_for_search_vector"]
-
-        base_query = {"match_all": {}}
-
-        if filters:
-            must_filters = []
-            must_not_filters = []
-
-            # must
-            for field, value in filters.get("include", {}).items():
-                if isinstance(value, list):
-                    must_filters.append({"terms": {field: value}})
-                elif isinstance(value, dict): # range
-                    must_filters.append({"range": {field: value}})
-                else:
-                    must_filters.append({"term": {field: value}})
-
-            # not_must
-            for field, value in filters.get("exclude", {}).items():
-                if isinstance(value, list):
-                    must_not_filters.append({"terms": {field: value}})
-                elif isinstance(value, dict): # range
-                    must_not_filters.append({"range": {field: value}})
-                else:
-                    must_not_filters.append({"term": {field: value}})
-
-            base_query = {
-                "bool": {
-                    "filter": must_filters,
-                    "must_not": must_not_filters
-                }
-            }
+    def knn_candidates(self, index_gender: str, text_self_vector: list, text_for_search_vector: list,
+                       k: int, filter_query: dict = None) -> list:
+        """
+        Approximate candidates from the HNSW graphs: the k nearest on each side of the
+        reciprocal score, in one search (ES unions the two knn clauses).
+        """
+        num_candidates = max(settings.MATCH_KNN_NUM_CANDIDATES, k)
+        knn = [
+            {"field": "text_for_search_vector", "query_vector": text_self_vector,
+             "k": k, "num_candidates": num_candidates},
+            {"field": "text_self_vector", "query_vector": text_for_search_vector,
+             "k": k, "num_candidates": num_candidates},
+        ]
+        if filter_query:
+            for clause in knn:
+                clause["filter"] = filter_query
+
+        resp = self.es.search(index=index_gender, knn=knn, size=2 * k, source=False)
+        if not resp:
+            return []
+        return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+    def match_search(self, vectors: tuple, size: int = 1, filters: dict = None, mode: str = None,
+                     target_index: str = None):
+        """
+        [(profile_id, reciprocal score)], best first. vectors = (text_self_vector, text_for_search_vector)
+        of the searching profile; they cannot be read back from the index, whose _source excludes them.
+        target_index replaces the opposite gender's index (benchmarks search a scratch index).
+        """
+        text_self_vector, text_for_search_vector = vectors
+        index_gender = target_index or ("female" if self.index == "male" else "male")
+        mode = mode or settings.MATCH_SEARCH_MODE
+
+        base_query = build_filter_query(filters)
+
+        if mode == "knn":
+            # rescore only the union of the ANN candidates with the exact reciprocal formula
+            candidate_ids = self.knn_candidates(index_gender, text_self_vector, text_for_search_vector,
+                                                max(settings.MATCH_KNN_K, size),
+                                                base_query if filters else None)
+            if not candidate_ids:
+                return []
+            base_query = {"ids": {"values": candidate_ids}}
 
         resp = self.es.search(
             index=index_gender,
@@ -64,11 +196,7 @@ class ElasticService:
                 "script_score": {
                     "query": base_query,
                     "script": {
-                        "source": """
-                            double score1 = cosineSimilarity(params.query_offer_vector, 'text_for_search_vector');
-                            double score2 = cosineSimilarity(params.query_search_vector, 'text_self_vector');
-                            return score1 + score2 + 1.0;
-                        """,
+                        "source": RECIPROCAL_SCORE_SCRIPT,
                         "params": {
                             "query_offer_vector": text_self_vector,
                             "query_search_vector": text_for_search_vector
@@ -76,8 +204,10 @@ class ElasticService:
                     }
                 }
             },
-            size=size
+            size=size,
+            source=False
         )
+        if not resp:
+            return []
 
-        list_profile_id = [hit["_id"] for hit in resp["hits"]["hits"]]
-        return list_profile_id
\ No newline at end of file
+        return [(hit["_id"], hit["_score"] - RECIPROCAL_SCORE_OFFSET) for hit in resp["hits"]["hits"]]
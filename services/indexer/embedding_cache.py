@@ -0,0 +1,199 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from common.config import settings
+from common.logger import Logger
+
+logger = Logger.get_logger(name=__name__)
+
+
+class DiskVectorStore:
+    """
+    Append-only on-disk vector store: a memory-mapped float32 matrix (vectors.f32) plus a
+    keys file where line N is the key of row N. A row is written and flushed before its key
+    is appended, so a key on disk always points at a complete vector.
+    """
+
+    def __init__(self, path: str, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.txt")
+
+        self._rows: Dict[str, int] = {}
+        # rows are line numbers, so this is the line count, not len(self._rows)
+        self._next_row = self._load_keys() if os.path.exists(self._keys_path) else 0
+
+        row_bytes = self.dim * 4
+        on_disk = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        lost = [key for key, row in self._rows.items() if row >= on_disk]
+        if lost:
+            logger.warning(f"{len(lost)} keys point past the end of {self._vectors_path}; dropped")
+            for key in lost:
+                del self._rows[key]
+        self._capacity = max(on_disk, self._next_row, initial_capacity)
+        self._vectors = self._open(self._capacity)
+        self._keys_file = open(self._keys_path, "a", encoding="utf-8")
+        logger.info(f"DiskVectorStore ready (path={path}, rows={len(self._rows)}, capacity={self._capacity})")
+
+    def _load_keys(self) -> int:
+        """
+        Map each key to the number of its line; returns the line count. A last line without its
+        newline is a key torn by a crash mid-append and is cut off, so the next append starts on
+        its own line. A key repeated on a later line keeps its first row.
+        """
+        with open(self._keys_path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            logger.warning(f"truncating a torn last key in {self._keys_path}")
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(complete)
+        lines = data[:complete].decode("utf-8").split("\n")[:-1]
+        for row, line in enumerate(lines):
+            key = line.rstrip("\r")
+            if key:
+                self._rows.setdefault(key, row)
+        return len(lines)
+
+    def _open(self, capacity: int) -> np.memmap:
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        new_capacity = self._capacity
+        while new_capacity < rows:
+            new_capacity *= 2
+        self._vectors.flush()
+        del self._vectors
+        self._vectors = self._open(new_capacity)
+        self._capacity = new_capacity
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._vectors[row])
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]):
+        new = {}
+        for key, vec in items:
+            if key not in self._rows:
+                new.setdefault(key, vec)
+        new_items = list(new.items())
+        if not new_items:
+            return
+        start = self._next_row
+        self._ensure_capacity(start + len(new_items))
+        for offset, (_, vec) in enumerate(new_items):
+            self._vectors[start + offset] = vec
+        self._vectors.flush()
+        for offset, (key, _) in enumerate(new_items):
+            self._rows[key] = start + offset
+            self._keys_file.write(key + "\n")
+        self._keys_file.flush()
+        self._next_row += len(new_items)
+
+    def close(self):
+        self._vectors.flush()
+        self._keys_file.close()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache in front of a SentenceTransformer:
+    in-memory LRU -> on-disk memory-mapped store -> model (one batched encode for all misses).
+    Keys are sha256(model name, text), so the store survives restarts and model changes never collide.
+    """
+
+    def __init__(self, model, model_name: str, cache_dir: Optional[str] = None,
+                 lru_size: Optional[int] = None, dim: Optional[int] = None):
+        self.model = model
+        self.model_name = model_name
+        self.lru_size = lru_size or settings.EMBEDDING_CACHE_LRU_SIZE
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+        path = os.path.join(cache_dir or settings.EMBEDDING_CACHE_DIR, safe_name)
+        self._disk = DiskVectorStore(path, dim or settings.EMBEDDING_DIM)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _lru_get(self, key: str) -> Optional[np.ndarray]:
+        vec = self._lru.get(key)
+        if vec is not None:
+            self._lru.move_to_end(key)
+        return vec
+
+    def _lru_put(self, key: str, vec: np.ndarray):
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: "OrderedDict[str, Tuple[str, List[int]]]" = OrderedDict()
+
+        for i, text in enumerate(texts):
+            key = self.key(text)
+            if key in missing:
+                missing[key][1].append(i)
+                continue
+            vec = self._lru_get(key)
+            if vec is not None:
+                self.memory_hits += 1
+            else:
+                vec = self._disk.get(key)
+                if vec is not None:
+                    self.disk_hits += 1
+                    self._lru_put(key, vec)
+            if vec is None:
+                missing[key] = (text, [i])
+            else:
+                results[i] = vec
+
+        if missing:
+            self.misses += len(missing)
+            encoded = self.model.encode([text for text, _ in missing.values()],
+                                        batch_size=settings.EMBEDDING_ENCODE_BATCH_SIZE)
+            new_items = []
+            for (key, (_, positions)), vec in zip(missing.items(), encoded):
+                vec = np.asarray(vec, dtype=np.float32)
+                new_items.append((key, vec))
+                self._lru_put(key, vec)
+                for i in positions:
+                    results[i] = vec
+            self._disk.put_many(new_items)
+
+        return [vec.tolist() for vec in results]
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._disk),
+        }
+
+    def close(self):
+        self._disk.close()
@@ -0,0 +1,73 @@
+import threading
+from typing import List, Optional
+from common.config import settings
+from common.logger import Logger
+from services.indexer.embedding_cache import EmbeddingCache
+
+logger = Logger.get_logger(name=__name__)
+
+WARMUP_TEXTS = [
+    "warmup",
+    "a short sentence to initialize the tokenizer and the model weights",
+    "another slightly longer sentence so the warmup batch has more than one sequence length",
+]
+
+_lock = threading.Lock()
+_model = None
+_cache: Optional[EmbeddingCache] = None
+
+
+def model_id() -> str:
+    """Name used for cache keys - int8 vectors differ slightly from fp32 ones, so they are cached apart."""
+    return f"{settings.EMBEDDING_MODEL_NAME}:int8" if settings.EMBEDDING_INT8 else settings.EMBEDDING_MODEL_NAME
+
+
+def load_model(name: str, int8: bool = False, warmup: bool = True):
+    from sentence_transformers import SentenceTransformer
+
+    logger.info(f"loading embedding model {name} (int8={int8})")
+    model = SentenceTransformer(name, device="cpu" if int8 else None)
+    if int8:
+        import torch
+        # dynamic quantization: Linear weights stored as int8, activations quantized on the fly (CPU only)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if warmup:
+        model.encode(WARMUP_TEXTS, batch_size=len(WARMUP_TEXTS))
+        logger.info(f"embedding model {name} warmed up")
+    return model
+
+
+def get_model():
+    """The process-wide model, loaded (and warmed up) on first use."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = load_model(settings.EMBEDDING_MODEL_NAME, int8=settings.EMBEDDING_INT8,
+                                    warmup=settings.EMBEDDING_WARMUP)
+    return _model
+
+
+def get_cache() -> Optional[EmbeddingCache]:
+    global _cache
+    if _cache is None and settings.EMBEDDING_CACHE_ENABLED:
+        with _lock:
+            if _cache is None:
+                _cache = EmbeddingCache(LazyModel(), model_id())
+    return _cache
+
+
+class LazyModel:
+    """Lets the cache answer hits without ever loading the model."""
+
+    def encode(self, texts, **kwargs):
+        return get_model().encode(texts, **kwargs)
+
+
+def encode(texts: List[str]) -> List[List[float]]:
+    cache = get_cache()
+    if cache:
+        vectors = cache.encode(texts)
+        logger.debug(f"embedding cache stats: {cache.stats()}")
+        return vectors
+    return get_model().encode(texts, batch_size=settings.EMBEDDING_ENCODE_BATCH_SIZE).tolist()
@@ -1,6 +1,9 @@
+from common.mongo_client import mongo
+from common.mongo_indexes import bootstrap_indexes
 from services.indexer.cosumer import consumer
 
 def main():
+    bootstrap_indexes(mongo.connect())
     consumer()
 
 if __name__ == "__main__":
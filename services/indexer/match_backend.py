@@ -0,0 +1,231 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from common.config import settings
+from common.logger import Logger
+from services.indexer.elastic_service import get_elastic_service, refresh_scheduler
+
+logger = Logger.get_logger(name=__name__)
+
+GENDER_INDICES = ("male", "female")
+
+
+def opposite(index_name: str) -> str:
+    return "female" if index_name == "male" else "male"
+
+
+class MatchBackend(ABC):
+    """
+    Where profile vectors live and where the reciprocal match search runs.
+    docs are (index_name, profile_id, {"text_self_vector": [...], "text_for_search_vector": [...]}).
+    """
+
+    @abstractmethod
+    def upsert(self, docs: List[Tuple[str, str, dict]]):
+        ...
+
+    @abstractmethod
+    def delete(self, index_name: str, ids: Iterable[str]):
+        ...
+
+    @abstractmethod
+    def search(self, index_name: str, profile_id: str, vectors: tuple, size: int = 1,
+               filters: dict = None, mask: np.ndarray = None) -> List[Tuple[str, float]]:
+        """
+        Best matches for a profile of index_name, searched in the opposite-gender set, as
+        (profile_id, reciprocal score) best first; the score is the same scale on every backend.
+        """
+        ...
+
+    def flush(self):
+        """Called when the consumer is idle."""
+
+
+class ElasticMatchBackend(MatchBackend):
+
+    def upsert(self, docs: List[Tuple[str, str, dict]]):
+        indices = {index_name for index_name, _, _ in docs}
+        ok = get_elastic_service(docs[0][0]).bulk_upsert(docs, refresh=refresh_scheduler.write_refresh)
+        refresh_scheduler.written(indices)
+        if not ok:
+            # surfaces to the consumer, which rewinds the batch instead of committing it
+            raise RuntimeError(f"bulk upsert of {len(docs)} profiles failed")
+        refresh_scheduler.maybe_refresh()
+
+    def delete(self, index_name: str, ids: Iterable[str]):
+        get_elastic_service(index_name).es.delete_documents_by_id(list(ids))
+        refresh_scheduler.written([index_name])
+
+    def search(self, index_name: str, profile_id: str, vectors: tuple, size: int = 1,
+               filters: dict = None, mask: np.ndarray = None) -> List[Tuple[str, float]]:
+        if mask is not None:
+            logger.warning("ElasticMatchBackend ignores boolean masks; use filters")
+        refresh_scheduler.before_search()
+        return get_elastic_service(index_name).match_search(vectors, size=size, filters=filters) or []
+
+    def flush(self):
+        refresh_scheduler.maybe_refresh()
+
+
+class VectorMatrix:
+    """
+    Row-aligned, contiguous, L2-normalized self/search matrices of one gender.
+    Rows grow by doubling; delete swaps the last row into the hole so rows stay dense.
+    """
+
+    CHUNK_ROWS = 8192
+
+    def __init__(self, dim: int, dtype=np.float32, initial_capacity: int = 1024):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._self = np.empty((initial_capacity, dim), dtype=self.dtype)
+        self._search = np.empty((initial_capacity, dim), dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _grow(self, rows: int):
+        capacity = len(self._self)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for name in ("_self", "_search"):
+            old = getattr(self, name)
+            new = np.empty((capacity, self.dim), dtype=self.dtype)
+            new[:len(self.ids)] = old[:len(self.ids)]
+            setattr(self, name, new)
+
+    def upsert(self, ids: Sequence[str], self_vectors, search_vectors):
+        self_vectors = self.normalize(self_vectors)
+        search_vectors = self.normalize(search_vectors)
+        self._grow(len(self.ids) + len(ids))
+        for doc_id, self_vec, search_vec in zip(ids, self_vectors, search_vectors):
+            row = self.rows.get(doc_id)
+            if row is None:
+                row = self.rows[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+            self._self[row] = self_vec
+            self._search[row] = search_vec
+
+    def delete(self, ids: Iterable[str]):
+        for doc_id in ids:
+            row = self.rows.pop(doc_id, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self._self[row] = self._self[last]
+                self._search[row] = self._search[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+            self.ids.pop()
+
+    def mask_of(self, ids: Iterable[str], include: bool = True) -> np.ndarray:
+        """Boolean row mask: True only for ids (include) or for everything but ids (exclude)."""
+        mask = np.full(len(self.ids), not include, dtype=bool)
+        for doc_id in ids:
+            row = self.rows.get(doc_id)
+            if row is not None:
+                mask[row] = include
+        return mask
+
+    def scores(self, query_self, query_search) -> np.ndarray:
+        """cos(query.self, row.search) + cos(query.search, row.self) for every row."""
+        n = len(self.ids)
+        query_self = self.normalize(query_self)
+        query_search = self.normalize(query_search)
+        if self.dtype == np.float32:
+            scores = self._search[:n] @ query_self
+            scores += self._self[:n] @ query_search
+            return scores
+        # NumPy has no fast float16 GEMV - upcast cache-sized chunks and multiply in float32
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, self.CHUNK_ROWS):
+            end = min(start + self.CHUNK_ROWS, n)
+            scores[start:end] = self._search[start:end].astype(np.float32) @ query_self
+            scores[start:end] += self._self[start:end].astype(np.float32) @ query_search
+        return scores
+
+    def top_k(self, query_self, query_search, k: int, mask: np.ndarray = None) -> List[Tuple[str, float]]:
+        if not self.ids or k <= 0:
+            return []
+        scores = self.scores(query_self, query_search)
+        if mask is not None:
+            scores = np.where(mask[:len(scores)], scores, -np.inf)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[row], float(scores[row])) for row in top if scores[row] != -np.inf]
+
+
+class InMemoryMatchBackend(MatchBackend):
+    """Per-gender VectorMatrix kept in process; no ES round trip for writes or searches."""
+
+    def __init__(self, dim: Optional[int] = None, dtype: Optional[str] = None):
+        dim = dim or settings.EMBEDDING_DIM
+        dtype = dtype or settings.MATCH_MEMORY_DTYPE
+        self.matrices = {index_name: VectorMatrix(dim, dtype) for index_name in GENDER_INDICES}
+
+    def upsert(self, docs: List[Tuple[str, str, dict]]):
+        for index_name, matrix in self.matrices.items():
+            part = [(doc_id, doc) for name, doc_id, doc in docs if name == index_name]
+            if part:
+                matrix.upsert([doc_id for doc_id, _ in part],
+                              [doc["text_self_vector"] for _, doc in part],
+                              [doc["text_for_search_vector"] for _, doc in part])
+
+    def delete(self, index_name: str, ids: Iterable[str]):
+        self.matrices[index_name].delete(ids)
+
+    def search(self, index_name: str, profile_id: str, vectors: tuple, size: int = 1,
+               filters: dict = None, mask: np.ndarray = None) -> List[Tuple[str, float]]:
+        if filters:
+            logger.warning("InMemoryMatchBackend ignores field filters; pass a boolean mask")
+        text_self_vector, text_for_search_vector = vectors
+        matrix = self.matrices[opposite(index_name)]
+        return matrix.top_k(text_self_vector, text_for_search_vector, size, mask)
+
+    def warm_start(self, chunk: int = 500):
+        """Load every profile from Mongo; texts already seen come straight from the embedding cache."""
+        from common.mongo_client import mongo
+        from services.indexer import embedding_provider
+
+        profiles = mongo.get_collection(settings.MONGO_COLL_PROFILESS)
+        cursor = profiles.find({}, {"_id": 1, "gender": 1, "free_text_self": 1,
+                                    "free_text_for_search": 1}).batch_size(chunk)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= chunk:
+                self._load(batch, embedding_provider.encode)
+                batch = []
+        if batch:
+            self._load(batch, embedding_provider.encode)
+        sizes = ", ".join(f"{name}={len(m)}" for name, m in self.matrices.items())
+        logger.info(f"InMemoryMatchBackend warm: {sizes}")
+
+    def _load(self, docs: list, encode):
+        vectors = encode([t for d in docs for t in (d["free_text_self"], d["free_text_for_search"])])
+        self.upsert([("male" if d["gender"] == "Male" else "female", d["_id"],
+                      {"text_self_vector": vectors[2 * i], "text_for_search_vector": vectors[2 * i + 1]})
+                     for i, d in enumerate(docs)])
+
+
+def create_match_backend(kind: Optional[str] = None) -> MatchBackend:
+    kind = kind or settings.MATCH_BACKEND
+    if kind == "memory":
+        backend = InMemoryMatchBackend()
+        if settings.MATCH_MEMORY_WARM_START:
+            backend.warm_start()
+        return backend
+    return ElasticMatchBackend()
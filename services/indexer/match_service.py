@@ -1,37 +1,85 @@
-from sentence_transformers import SentenceTransformer
+from typing import List, Optional
 from common.config import settings
 from common.logger import Logger
-from services.indexer.elastic_service import ElasticService
+from services.indexer import embedding_provider
+from services.indexer.match_backend import MatchBackend, create_match_backend
 from services.indexer.mongo_service import MongoService
 
 mongoService = MongoService()
-model = SentenceTransformer("all-MiniLM-L6-v2")
 logger = Logger.get_logger(name=__name__)
+_match_backend: Optional[MatchBackend] = None
 
-def match_server(profile:dict, topic:list = [settings.TOPIC_PROFILES_CREATEDD]):
-    logger.info(f"start consumer listen - topic: {topic}")
 
-    index_name = "female"
-    if profile["gender"] == "Male":
-        index_name = "male"
+def get_match_backend() -> MatchBackend:
+    global _match_backend
+    if _match_backend is None:
+        _match_backend = create_match_backend()
+    return _match_backend
 
-    esr = ElasticService(index_name)
+
+def index_name_for(profile: dict) -> str:
+    return "male" if profile["gender"] == "Male" else "female"
+
+
+def filter_fields(profile: dict) -> dict:
+    """Fields the enricher normalized for ES term/range filters (absent on raw profiles_create events)."""
+    return {field: profile[field] for field in ("location_norm", "age_bucket", "age") if profile.get(field) is not None}
+
+
+def store_matches(index_name: str, profile_id: str, vectors: tuple):
+    matches = get_match_backend().search(index_name, profile_id, vectors, size=settings.MATCH_CANDIDATES_PER_PROFILE)
+    mongoService.add_matches(profile_id, matches)
+
+
+def match_server(profile:dict, topic:list = [settings.INDEXER_INPUT_TOPIC]):
+    logger.debug("indexing profile %s - topic: %s", profile.get("unique_id"), topic)
+
+    index_name = index_name_for(profile)
     profile_id = profile["unique_id"]
+    text_self_vector, text_for_search_vector = embedding_provider.encode(
+        [profile['free_text_self'], profile['free_text_for_search']])
 
-    esr.upsert_doc(
-        profile["unique_id"],
-        {
+    get_match_backend().upsert([(index_name, profile_id, {
                 "id" : profile_id,
-                "text_self_vector": model.encode(profile['free_text_self']).tolist(),
-                "text_for_search_vector": model.encode(profile['free_text_for_search']).tolist()
-        },
-        "true"
-    )
-    logger.debug(f"debug 1, consumer listen - topic: {topic}")
-
-    list_profiles_id = esr.match_search(profile_id)
-    mongoService.insert_match(profile_id ,list_profiles_id)
-
-    logger.debug(f"debug 2, consumer listen - topic: {topic}")
-    for profile_match in list_profiles_id:
-        mongoService.insert_match(profile_match , [profile_id])
\ No newline at end of file
+                "text_self_vector": text_self_vector,
+                "text_for_search_vector": text_for_search_vector,
+                **filter_fields(profile),
+    })])
+    logger.debug("indexed profile %s - topic: %s", profile_id, topic)
+
+    store_matches(index_name, profile_id, (text_self_vector, text_for_search_vector))
+    mongoService.flush()
+    logger.debug("stored matches of %s - topic: %s", profile_id, topic)
+
+
+def match_server_batch(profiles: List[dict], topic:list = [settings.INDEXER_INPUT_TOPIC]):
+    """
+    Same as match_server for a whole micro-batch: one encode call for all free texts
+    and one backend write (a single _bulk request for ES) for all vectors.
+    """
+    if not profiles:
+        return
+    logger.info("start batch of %d profiles - topic: %s", len(profiles), topic)
+
+    texts = []
+    for profile in profiles:
+        texts.append(profile['free_text_self'])
+        texts.append(profile['free_text_for_search'])
+    vectors = embedding_provider.encode(texts)
+
+    docs = []
+    for i, profile in enumerate(profiles):
+        profile_id = profile["unique_id"]
+        docs.append((index_name_for(profile), profile_id, {
+            "id": profile_id,
+            "text_self_vector": vectors[2 * i],
+            "text_for_search_vector": vectors[2 * i + 1],
+            **filter_fields(profile),
+        }))
+
+    get_match_backend().upsert(docs)
+    logger.debug("indexed %d profiles - topic: %s", len(docs), topic)
+
+    for index_name, profile_id, doc in docs:
+        store_matches(index_name, profile_id, (doc["text_self_vector"], doc["text_for_search_vector"]))
+    mongoService.flush()
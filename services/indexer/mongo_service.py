@@ -1,25 +1,77 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+from pymongo import UpdateOne
+from common.config import settings
+from common.feedback_edges import edges_mode
 from common.mongo_client import MongoConnection
 
+# candidates are ordered (score desc, id asc) - the same order GET /waiting_matches pages through
+CANDIDATE_ORDER = {"score": -1, "id": 1}
+
+
+def merge_candidates(new: Dict[str, float], top_k: int, keep_existing: bool = False) -> list:
+    """
+    Pipeline update that merges new {id: score} into the document's candidates array:
+    entries for the same ids are replaced (or, with keep_existing, the new ones are dropped),
+    the array is re-sorted and cut to top_k, all server side in one round trip
+    (needs MongoDB 5.2+ for $sortArray).
+    """
+    new_entries = [{"id": cand_id, "score": float(score)} for cand_id, score in new.items()]
+    current = {"$ifNull": ["$candidates", []]}
+    # $literal: ids are data, never to be read as field paths
+    if keep_existing:
+        kept = current
+        added = {"$filter": {"input": {"$literal": new_entries},
+                             "cond": {"$not": [{"$in": ["$$this.id", {"$ifNull": ["$candidates.id", []]}]}]}}}
+    else:
+        kept = {"$filter": {"input": current, "cond": {"$not": [{"$in": ["$$this.id", {"$literal": list(new)}]}]}}}
+        added = {"$literal": new_entries}
+    merged = {"$sortArray": {"input": {"$concatArrays": [kept, added]}, "sortBy": CANDIDATE_ORDER}}
+    return [{"$set": {"candidates": {"$slice": [merged, top_k]}, "updated_at": datetime.now(timezone.utc)}}]
+
+
 class MongoService:
-    def __init__(self):
-        self.mongo_db = MongoConnection()
+    """
+    Candidate writes of the indexer. Scored matches are accumulated with add_match / add_matches
+    and written by flush(): each user's candidates document keeps only the top-K by reciprocal
+    score, so it stays bounded no matter how many profiles get indexed.
+    """
 
-    def insert_match(self, profile_id:str, list_profiles_id:list):
+    def __init__(self, top_k: int = None):
+        self.mongo_db = MongoConnection()
+        self.collection = settings.MONGO_COLL_CANDIDATES
+        self.likes_collection = settings.MONGO_COLLECTION_LIKES
+        self.top_k = top_k or settings.CANDIDATES_TOP_K
+        self._pending: Dict[str, Dict[str, float]] = {}
 
-        if self.mongo_db.check_exists_by_id("likes", profile_id):
-            self.mongo_db.update(
-                "likes",
-                {"profile_id": profile_id},
-                {"$addToSet": {"waiting": {"$each": list_profiles_id}}}
-            )
+    def add_match(self, profile_id: str, matches: Iterable[Tuple[str, float]]):
+        candidates = self._pending.setdefault(profile_id, {})
+        for match_id, score in matches:
+            candidates[match_id] = max(score, candidates.get(match_id, score))
 
-        else:
-            doc = {
-                "profile_id" : profile_id,
-                "likes" : [],
-                "waiting" : list_profiles_id,
-                "dislikes" : []
-            }
-            self.mongo_db.insert('likes',doc,profile_id)
+    def add_matches(self, profile_id: str, matches: List[Tuple[str, float]]):
+        """profile_id gets each match as a candidate and each match gets profile_id; the score is symmetric."""
+        self.add_match(profile_id, matches)
+        for match_id, score in matches:
+            self.add_match(match_id, [(profile_id, score)])
 
+    def flush(self):
+        if not self._pending:
+            return None
+        pending, self._pending = self._pending, {}
+        if not edges_mode():
+            # the match engine looks feedback up by profile_id, so every candidate owner needs its likes doc
+            self.mongo_db.bulk_write(self.likes_collection, [
+                UpdateOne({"_id": profile_id},
+                          {"$setOnInsert": {"profile_id": profile_id, "likes": [], "dislikes": []}},
+                          upsert=True)
+                for profile_id in pending
+            ], ordered=False)
+        return self.mongo_db.bulk_write(self.collection, [
+            UpdateOne({"_id": profile_id}, merge_candidates(candidates, self.top_k), upsert=True)
+            for profile_id, candidates in pending.items()
+        ], ordered=False)
 
+    def insert_match(self, profile_id: str, matches: List[Tuple[str, float]]):
+        self.add_match(profile_id, matches)
+        self.flush()
@@ -1,10 +1,12 @@
 # services/match_engine/app/decision.py
-from typing import List, Dict, Literal
-from common.logger import Logger
+import logging
+from typing import Callable, List, Dict, Literal, Optional, Tuple
+from common.logger import Logger, Sampler, payload
 from mongo_reader import MongoReader
 from common.config import settings
 
 logger = Logger.get_logger(name=__name__)
+sampler = Sampler()
 
   # {"topic": str, "key": str, "value": dict}
 
@@ -21,24 +23,53 @@ class MatchDecider:
 
     def process_feedback(self, msg: Dict[str, str]) ->List:
 
+        pair = self._like_pair(msg)
+        if not pair:
+            return []
+        actor, target = pair
+
+        return self._decide(actor, target,
+                            blocked=self.reader.has_blocking_dislike(actor, target),
+                            mutual=lambda: self.reader.has_mutual_like(actor, target))
+
+    def process_feedback_batch(self, msgs: List[Dict[str, str]]) -> List:
+        """Same decisions as process_feedback for a whole poll batch, with one Mongo query in total."""
+        pairs = [pair for pair in (self._like_pair(msg) for msg in msgs) if pair]
+        if not pairs:
+            return []
+
+        relations = self.reader.fetch_relations(pairs)
+        actions = []
+        for actor, target in pairs:
+            target_rel = relations.get(target, {})
+            actions.extend(self._decide(actor, target,
+                                        blocked=actor in target_rel.get("dislikes", ()),
+                                        mutual=lambda: actor in target_rel.get("likes", ())))
+        return actions
+
+    @staticmethod
+    def _like_pair(msg: Dict[str, str]) -> Optional[Tuple[str, str]]:
         actor = msg.get("actor_id")
         target = msg.get("target_id")
         status: Literal["likes", "dislikes", "waiting"] = msg.get("status", "waiting")  # type: ignore
 
         if not actor or not target:
-            logger.warning(f"bad message (missing ids): {msg}")
-            return []
+            logger.warning("bad message (missing ids): %s", payload(msg))
+            return None
 
         if status != "likes":
-            return []
+            return None
+        return actor, target
+
+    def _decide(self, actor: str, target: str, blocked: bool, mutual: Callable[[], bool]) -> List:
 
-        if self.reader.has_blocking_dislike(actor, target):
-            logger.info(f"blocked by dislike: {actor} - {target}")
+        if blocked:
+            sampler.log(logger, logging.INFO, "blocked by dislike: %s - %s", actor, target)
             return []
 
 
-        if self.reader.has_mutual_like(actor, target):
-            logger.info(f"match! {actor} - {target}")
+        if mutual():
+            logger.info("match! %s - %s", actor, target)
             return [
                 {"topic": self.topic_match, "key": actor,
                  "value": {"user_id": actor, "partner_id": target, "reason": "mutual_like"}},
@@ -47,10 +78,8 @@ class MatchDecider:
             ]
 
 
-        logger.info(f"single like {actor} → {target}")
+        sampler.log(logger, logging.INFO, "single like %s → %s", actor, target)
         return [
             {"topic": self.topic_like, "key": target,
              "value": {"user_id": target, "from_user_id": actor, "reason": "single_like"}}
         ]
-
-
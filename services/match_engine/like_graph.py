@@ -0,0 +1,160 @@
+import os
+import pickle
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from common.logger import Logger
+
+logger = Logger.get_logger(name=__name__)
+
+
+class LikeGraph:
+    """
+    In-memory like/dislike graph of the match engine, fed by the feedbacks stream.
+    User ids are interned to ints; per user we keep the set of users they liked / disliked.
+    Answers the same questions as MongoReader (has_mutual_like, has_blocking_dislike,
+    fetch_relations), so MatchDecider can use either one.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._likes: Dict[int, Set[int]] = {}
+        self._dislikes: Dict[int, Set[int]] = {}
+        # guards the id tables and the edge sets: parallel workers apply while the dispatcher snapshots
+        self._lock = threading.RLock()
+
+    def intern(self, user_id: str) -> int:
+        uid = self._ids.get(user_id)
+        if uid is None:
+            with self._lock:
+                uid = self._ids.get(user_id)
+                if uid is None:
+                    uid = len(self._names)
+                    self._names.append(user_id)
+                    self._ids[user_id] = uid
+        return uid
+
+    @property
+    def users(self) -> int:
+        return len(self._names)
+
+    @property
+    def edges(self) -> int:
+        with self._lock:
+            return sum(map(len, self._likes.values())) + sum(map(len, self._dislikes.values()))
+
+    # ---------- mutations ----------
+    def apply(self, actor_id: str, target_id: str, status: str):
+        """Mirror of likes.save_feedback: add to the status set and pull from the others."""
+        with self._lock:
+            actor = self.intern(actor_id)
+            target = self.intern(target_id)
+            for name, edges in (("likes", self._likes), ("dislikes", self._dislikes)):
+                if status == name:
+                    edges.setdefault(actor, set()).add(target)
+                elif actor in edges:
+                    edges[actor].discard(target)
+
+    def load_user(self, user_id: str, likes: Iterable[str], dislikes: Iterable[str]):
+        with self._lock:
+            actor = self.intern(user_id)
+            if likes:
+                self._likes.setdefault(actor, set()).update(self.intern(t) for t in likes)
+            if dislikes:
+                self._dislikes.setdefault(actor, set()).update(self.intern(t) for t in dislikes)
+
+    def load_from_mongo(self, collection, id_field: str = "profile_id",
+                        likes_field: str = "likes", dislikes_field: str = "dislikes"):
+        cursor = collection.find({}, {id_field: 1, likes_field: 1, dislikes_field: 1}).batch_size(1000)
+        for doc in cursor:
+            self.load_user(doc.get(id_field) or doc["_id"], doc.get(likes_field), doc.get(dislikes_field))
+        logger.info(f"LikeGraph loaded from Mongo: users={self.users}, edges={self.edges}")
+
+    def load_edges_from_mongo(self, collection):
+        """Warm start from the edge-per-document layout (FEEDBACK_STORAGE_MODE=edges)."""
+        cursor = collection.find({"status": {"$in": ["likes", "dislikes"]}},
+                                 {"_id": 0, "actor_id": 1, "target_id": 1, "status": 1}).batch_size(1000)
+        for edge in cursor:
+            self.apply(edge["actor_id"], edge["target_id"], edge["status"])
+        logger.info(f"LikeGraph loaded from Mongo edges: users={self.users}, edges={self.edges}")
+
+    # ---------- queries ----------
+    def _has(self, edges: Dict[int, Set[int]], owner_id: str, member_id: str) -> bool:
+        owner = self._ids.get(owner_id)
+        member = self._ids.get(member_id)
+        if owner is None or member is None:
+            return False
+        return member in edges.get(owner, ())
+
+    def has_mutual_like(self, actor_id: str, target_id: str) -> bool:
+        return self._has(self._likes, target_id, actor_id)
+
+    def has_blocking_dislike(self, actor_id: str, target_id: str) -> bool:
+        return self._has(self._dislikes, target_id, actor_id)
+
+    def fetch_relations(self, pairs: List[Tuple[str, str]]) -> Dict[str, Dict[str, Set[str]]]:
+        relations: Dict[str, Dict[str, Set[str]]] = {}
+        for actor, target in pairs:
+            rel = relations.setdefault(target, {"likes": set(), "dislikes": set()})
+            if self.has_mutual_like(actor, target):
+                rel["likes"].add(actor)
+            if self.has_blocking_dislike(actor, target):
+                rel["dislikes"].add(actor)
+        return relations
+
+    # ---------- snapshot ----------
+    def save_snapshot(self, path: str, offsets: Dict[str, int]):
+        """Atomically write the graph plus the Kafka offsets ("topic:partition" -> next offset) it reflects."""
+        # copy under the lock (cheap, no I/O), serialize and write outside it
+        with self._lock:
+            state = {
+                "names": list(self._names),
+                "likes": {uid: array("I", sorted(t)) for uid, t in self._likes.items() if t},
+                "dislikes": {uid: array("I", sorted(t)) for uid, t in self._dislikes.items() if t},
+                "offsets": offsets,
+            }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        logger.info(f"LikeGraph snapshot saved ({path}, users={self.users}, offsets={offsets})")
+
+    def load_snapshot(self, path: str) -> Optional[Dict[str, int]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.error(f"LikeGraph snapshot {path} unreadable, ignoring: {e}")
+            return None
+        with self._lock:
+            self._names = list(state["names"])
+            self._ids = {name: uid for uid, name in enumerate(self._names)}
+            self._likes = {uid: set(t) for uid, t in state["likes"].items()}
+            self._dislikes = {uid: set(t) for uid, t in state["dislikes"].items()}
+        logger.info(f"LikeGraph snapshot loaded ({path}, users={self.users}, edges={self.edges})")
+        return state["offsets"]
+
+    # ---------- stats ----------
+    def memory_bytes(self) -> int:
+        """Approximate resident size: id tables, per-user sets and the interned ints they point to."""
+        with self._lock:
+            size = sys.getsizeof(self._ids) + sys.getsizeof(self._names)
+            size += sum(sys.getsizeof(name) + sys.getsizeof(uid) for name, uid in self._ids.items())
+            for edges in (self._likes, self._dislikes):
+                size += sys.getsizeof(edges) + sum(map(sys.getsizeof, edges.values()))
+            return size
+
+    def stats(self) -> Dict[str, float]:
+        edges = self.edges
+        memory = self.memory_bytes()
+        return {
+            "users": self.users,
+            "edges": edges,
+            "memory_mb": round(memory / 2 ** 20, 1),
+            "mb_per_million_edges": round(memory / 2 ** 20 / (edges / 1e6), 1) if edges else 0.0,
+        }
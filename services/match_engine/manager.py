@@ -1,12 +1,23 @@
+import logging
+import threading
+import time
+from kafka import TopicPartition
 from common.config import settings
-from common.logger import Logger
+from common.logger import Logger, Sampler, payload
 from common.kafka_consumer import Consumer
+from common.feedback_edges import edges_mode
 from common.kafka_producer import Producer
+from common.mongo_client import mongo
+from common.mongo_indexes import bootstrap_indexes
 
-from mongo_reader import MongoReader
+from mongo_reader import EdgeReader, MongoReader
 from decision import MatchDecider
+from like_graph import LikeGraph
+from worker_pool import KeyedWorkerPool, OffsetTracker
 
 logger = Logger.get_logger(name=__name__)
+# per-event logs: 1 in LOG_SAMPLE_EVERY
+sampler = Sampler()
 
 INPUT_TOPIC        = getattr(settings, "TOPIC_FEEDBACKS", "feedbacks")
 OUTPUT_TOPIC_LIKE  = getattr(settings, "TOPIC_NOTIFY_LIKE", "notify.like")
@@ -20,37 +31,252 @@ ID_FIELD        = getattr(settings, "PROFILE_ID_FIELD", "profile_id")
 LIKES_FIELD     = getattr(settings, "LIKES_FIELD", "likes")
 DISLIKES_FIELD  = getattr(settings, "DISLIKES_FIELD", "dislikes")
 
-reader  = MongoReader(COLLECTION_NAME, id_field=ID_FIELD,likes_field=LIKES_FIELD, dislikes_field=DISLIKES_FIELD)
+if edges_mode():
+    reader = EdgeReader(settings.MONGO_COLL_FEEDBACK_EDGES)
+else:
+    reader = MongoReader(COLLECTION_NAME, id_field=ID_FIELD,likes_field=LIKES_FIELD, dislikes_field=DISLIKES_FIELD)
 decider = MatchDecider(reader, topic_like=OUTPUT_TOPIC_LIKE, topic_match=OUTPUT_TOPIC_MATCH)
 
-consumer = Consumer(topics=[INPUT_TOPIC], group_id=GROUP_ID, enable_auto_commit=True)
+# batch and parallel modes commit offsets themselves, once the actions are acknowledged by Kafka
+MANUAL_COMMIT = settings.MATCH_ENGINE_BATCH_MODE or settings.MATCH_ENGINE_WORKERS > 0
+consumer = Consumer(topics=[INPUT_TOPIC], group_id=GROUP_ID, enable_auto_commit=not MANUAL_COMMIT)
 producer = Producer()
 
+graph = None
+graph_positions = {}
+last_snapshot = time.monotonic()
+
+
+def partition_key(topic, partition) -> str:
+    return f"{topic}:{partition}"
+
+
+def warm_start_graph() -> LikeGraph:
+    """
+    Snapshot (or a full Mongo scan when there is none), then replay - apply only, no decisions -
+    the events the group already committed but the snapshot does not reflect yet.
+    """
+    like_graph = LikeGraph()
+    snapshot_offsets = like_graph.load_snapshot(settings.MATCH_ENGINE_GRAPH_SNAPSHOT_PATH)
+    committed = consumer.committed_offsets(INPUT_TOPIC)
+    if snapshot_offsets is None:
+        # recorded before the scan, so writes racing the scan are replayed afterwards
+        start = consumer.end_offsets(INPUT_TOPIC)
+        if edges_mode():
+            like_graph.load_edges_from_mongo(reader.collection)
+        else:
+            like_graph.load_from_mongo(reader.collection, ID_FIELD, LIKES_FIELD, DISLIKES_FIELD)
+    else:
+        start = {tp: snapshot_offsets.get(partition_key(tp.topic, tp.partition), 0) for tp in committed}
+
+    replayed = 0
+    for msg in consumer.read_range(start, committed):
+        apply_to_graph(like_graph, [msg])
+        replayed += 1
+    logger.info(f"LikeGraph warm start done (replayed={replayed}): {like_graph.stats()}")
+    return like_graph
+
+
+def apply_to_graph(like_graph: LikeGraph, messages):
+    for msg in messages:
+        apply_feedback(like_graph, msg.value)
+        graph_positions[partition_key(msg.topic, msg.partition)] = msg.offset + 1
+
+
+def apply_feedback(like_graph: LikeGraph, feedback):
+    if isinstance(feedback, dict) and feedback.get("actor_id") and feedback.get("target_id"):
+        like_graph.apply(feedback["actor_id"], feedback["target_id"], feedback.get("status", "waiting"))
+
+
+def maybe_snapshot_graph(force: bool = False):
+    global last_snapshot
+    if graph is None:
+        return
+    if force or time.monotonic() - last_snapshot >= settings.MATCH_ENGINE_GRAPH_SNAPSHOT_INTERVAL_S:
+        graph.save_snapshot(settings.MATCH_ENGINE_GRAPH_SNAPSHOT_PATH, dict(graph_positions))
+        last_snapshot = time.monotonic()
+
+
+def send_actions(actions):
+    for action in actions:
+        queued = producer.send_async(
+            topic=action['topic'],
+            value=action['value'],
+            key=action.get('key'),
+            on_success=lambda md, action=action: sampler.log(
+                logger, logging.INFO, "Sent message to %s: %s", action['topic'], payload(action['value'])),
+            on_error=lambda exc, action=action: logger.error(
+                "Failed to send message to %s: %s (%s)", action['topic'], payload(action['value']), exc),
+        )
+        if not queued:
+            logger.error("Failed to send message to %s: %s", action['topic'], payload(action['value']))
+
+
+def valid_feedbacks(messages):
+    feedbacks = []
+    for msg in messages:
+        feedback = msg.value
+        sampler.log(logger, logging.INFO, "Received message: %s", payload(feedback))
+        if not isinstance(feedback, dict):
+            logger.warning("Invalid message format, expected dict but got %s", type(feedback))
+            continue
+        feedbacks.append(feedback)
+    return feedbacks
+
+
+def process_batch(batch):
+    """Decide a batch and wait for its actions; raises if any of them was not delivered."""
+    failed_before = producer.failed
+    if graph is not None:
+        apply_to_graph(graph, batch)
+    send_actions(decider.process_feedback_batch(valid_feedbacks(batch)))
+    # one wait for the whole batch instead of one broker round trip per action
+    if not producer.flush() or producer.failed > failed_before:
+        raise RuntimeError(f"{producer.failed - failed_before} actions were not delivered")
+
+
+def pair_key(feedback) -> str:
+    """Both directions of a pair share a worker: a's like of b and b's like of a are decided in order."""
+    if not isinstance(feedback, dict):
+        return ""
+    return "|".join(sorted((str(feedback.get("actor_id")), str(feedback.get("target_id")))))
+
+
+def handle_in_worker(tracker: OffsetTracker, msg):
+    """
+    Decide one event on a pool worker. The event counts as complete once every action it
+    produced is acknowledged by Kafka; any failure marks it failed, so its offset is redelivered.
+    """
+    tp = TopicPartition(msg.topic, msg.partition)
+    try:
+        if graph is not None:
+            apply_feedback(graph, msg.value)
+        feedbacks = valid_feedbacks([msg])
+        actions = decider.process_feedback(feedbacks[0]) if feedbacks else []
+    except Exception as e:
+        logger.error(f"Error deciding feedback at {tp.topic}:{tp.partition}@{msg.offset}: {e}")
+        tracker.fail(tp, msg.offset)
+        return
+    if not actions:
+        tracker.complete(tp, msg.offset)
+        return
+
+    remaining = [len(actions)]
+    lock = threading.Lock()
+
+    def delivered(md, action):
+        sampler.log(logger, logging.INFO, "Sent message to %s: %s", action['topic'], payload(action['value']))
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            tracker.complete(tp, msg.offset)
+
+    def failed(exc, action):
+        logger.error("Failed to send message to %s: %s (%s)", action['topic'], payload(action['value']), exc)
+        tracker.fail(tp, msg.offset)
+
+    for action in actions:
+        queued = producer.send_async(
+            topic=action['topic'], value=action['value'], key=action.get('key'),
+            on_success=lambda md, action=action: delivered(md, action),
+            on_error=lambda exc, action=action: failed(exc, action),
+        )
+        if not queued:
+            tracker.fail(tp, msg.offset)
+
+
+def commit_completed(tracker: OffsetTracker):
+    positions = tracker.committable()
+    if positions and consumer.commit_offsets(positions):
+        for tp, offset in positions.items():
+            graph_positions[partition_key(tp.topic, tp.partition)] = offset
+
+
+def recover_failed(pool: KeyedWorkerPool, tracker: OffsetTracker):
+    """Drain the pool, commit what completed, then seek failed partitions back to their first unfinished event."""
+    pool.join()
+    producer.flush()
+    commit_completed(tracker)
+    positions = {}
+    for tp in tracker.failed():
+        offset = tracker.first_pending(tp)
+        if offset is not None:
+            positions[tp] = offset
+        tracker.reset(tp)
+    consumer.seek(positions)
+    logger.warning(f"Redelivering from {positions} after failed events")
+    time.sleep(settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS / 1000)
+
+
+def process_parallel():
+    """
+    Dispatch events to MATCH_ENGINE_WORKERS threads keyed by pair_key: events of one pair stay
+    in order, unrelated pairs overlap their Mongo and Kafka round trips. A partition's offset is
+    committed only up to its lowest event that is not complete yet.
+    """
+    tracker = OffsetTracker()
+    pool = KeyedWorkerPool(settings.MATCH_ENGINE_WORKERS, lambda msg: handle_in_worker(tracker, msg),
+                           queue_size=settings.MATCH_ENGINE_WORKER_QUEUE_SIZE, name="match-engine")
+    try:
+        while consumer.ready:
+            batch = consumer.poll_batch(settings.MATCH_ENGINE_BATCH_SIZE, settings.MATCH_ENGINE_BATCH_WAIT_MS)
+            for msg in batch:
+                tracker.add(TopicPartition(msg.topic, msg.partition), msg.offset)
+                pool.submit(pair_key(msg.value), msg)
+            if tracker.failed():
+                recover_failed(pool, tracker)
+            commit_completed(tracker)
+            maybe_snapshot_graph()
+    finally:
+        pool.join()
+        producer.flush()
+        commit_completed(tracker)
+        pool.close()
+
+
 def process_messages():
     if not consumer.ready:
         logger.error("Consumer not ready, exiting")
         return
+    global graph
+    bootstrap_indexes(mongo.connect())
     try:
-        for msg in consumer.listen():
-            logger.info(f"Received message: {msg.value}")
-            feedback = msg.value
-            if not isinstance(feedback, dict):
-                logger.warning(f"Invalid message format, expected dict but got {type(feedback)}")
-                continue
-            actions = decider.process_feedback(feedback)
-            for action in actions:
-                success = producer.send_message(
-                    topic=action['topic'],
-                    value=action['value'],
-                    key=action.get('key')
-                )
-                if success:
-                    logger.info(f"Sent message to {action['topic']}: {action['value']}")
-                else:
-                    logger.error(f"Failed to send message to {action['topic']}: {action['value']}")
+        if settings.MATCH_ENGINE_GRAPH_CACHE:
+            graph = warm_start_graph()
+            decider.reader = graph
+
+        if settings.MATCH_ENGINE_WORKERS > 0:
+            process_parallel()
+            return
+
+        if not settings.MATCH_ENGINE_BATCH_MODE:
+            for msg in consumer.listen():
+                if graph is not None:
+                    apply_to_graph(graph, [msg])
+                for feedback in valid_feedbacks([msg]):
+                    send_actions(decider.process_feedback(feedback))
+                producer.flush()
+                maybe_snapshot_graph()
+            return
+
+        for batch in consumer.listen_batches(settings.MATCH_ENGINE_BATCH_SIZE, settings.MATCH_ENGINE_BATCH_WAIT_MS,
+                                             yield_empty=True):
+            if batch:
+                try:
+                    process_batch(batch)
+                except Exception as e:
+                    logger.error(f"Batch of {len(batch)} feedbacks failed, retrying: {e}")
+                    consumer.rewind(batch)
+                    time.sleep(settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS / 1000)
+            maybe_snapshot_graph()
     except Exception as e:
         logger.error(f"Error processing messages: {e}")
     finally:
+        try:
+            maybe_snapshot_graph(force=True)
+        except Exception as e:
+            logger.error(f"Error saving LikeGraph snapshot: {e}")
         try:
             producer.flush_producer()
         except Exception as e:
@@ -59,4 +285,3 @@ def process_messages():
             consumer.close()
         except Exception as e:
             logger.error(f"Error closing consumer: {e}")
-
@@ -1,3 +1,4 @@
+from typing import Dict, List, Set, Tuple
 from common.config import settings
 from common.logger import Logger
 from common.mongo_client import mongo
@@ -23,8 +24,68 @@ class MongoReader:
         doc = self.collection.find_one({self.id_field: target_id, self.dislikes_field: actor_id}, {self.id_field: 1})
         return doc is not None
 
+    def fetch_relations(self, pairs: List[Tuple[str, str]]) -> Dict[str, Dict[str, Set[str]]]:
+        """
+        One $in query for a batch of (actor, target) pairs.
+        Returns {target: {"likes": actors the target liked, "dislikes": actors the target disliked}},
+        where the likes/dislikes arrays are filtered server side down to the batch's actors.
+        """
+        if not pairs:
+            return {}
+        targets = list({target for _, target in pairs})
+        actors = list({actor for actor, _ in pairs})
 
+        def only_actors(field: str) -> dict:
+            return {"$filter": {"input": {"$ifNull": [f"${field}", []]},
+                                "cond": {"$in": ["$$this", actors]}}}
 
+        cursor = self.collection.find(
+            {self.id_field: {"$in": targets}},
+            {"_id": 0, self.id_field: 1,
+             self.likes_field: only_actors(self.likes_field),
+             self.dislikes_field: only_actors(self.dislikes_field)})
+        relations = {}
+        for doc in cursor:
+            relations[doc[self.id_field]] = {
+                "likes": set(doc.get(self.likes_field) or []),
+                "dislikes": set(doc.get(self.dislikes_field) or []),
+            }
+        logger.debug(f"fetch_relations: {len(pairs)} pairs, {len(relations)}/{len(targets)} targets found")
+        return relations
 
 
+class EdgeReader:
+    """
+    MongoReader for the edge-per-document layout (FEEDBACK_STORAGE_MODE=edges): the same three
+    questions, answered with point reads on the unique (actor_id, target_id) index.
+    """
 
+    def __init__(self, collection_name: str = None):
+        self.collection = mongo.get_collection(collection_name or settings.MONGO_COLL_FEEDBACK_EDGES)
+        logger.info(f"EdgeReader ready (coll='{self.collection.name}')")
+
+    def _has_status(self, owner_id: str, member_id: str, status: str) -> bool:
+        return self.collection.find_one({"actor_id": owner_id, "target_id": member_id, "status": status},
+                                        {"_id": 1}) is not None
+
+    def has_mutual_like(self, actor_id: str, target_id: str) -> bool:
+        return self._has_status(target_id, actor_id, "likes")
+
+    def has_blocking_dislike(self, actor_id: str, target_id: str) -> bool:
+        return self._has_status(target_id, actor_id, "dislikes")
+
+    def fetch_relations(self, pairs: List[Tuple[str, str]]) -> Dict[str, Dict[str, Set[str]]]:
+        """Same result as MongoReader.fetch_relations: edges from the batch's targets to its actors."""
+        if not pairs:
+            return {}
+        targets = list({target for _, target in pairs})
+        actors = list({actor for actor, _ in pairs})
+        cursor = self.collection.find(
+            {"actor_id": {"$in": targets}, "target_id": {"$in": actors}, "status": {"$in": ["likes", "dislikes"]}},
+            {"_id": 0, "actor_id": 1, "target_id": 1, "status": 1})
+        relations = {}
+        for edge in cursor:
+            rel = relations.setdefault(edge["actor_id"], {"likes": set(), "dislikes": set()})
+            rel[edge["status"]].add(edge["target_id"])
+        logger.debug(f"fetch_relations: {len(pairs)} pairs, {len(relations)}/{len(targets)} targets with edges")
+        return relations
@@ -0,0 +1,124 @@
+import queue
+import threading
+import zlib
+from collections import deque
+from typing import Callable, Dict, Hashable, List, Optional
+from kafka import TopicPartition
+from common.logger import Logger
+
+logger = Logger.get_logger(name=__name__)
+
+_STOP = object()
+
+
+class OffsetTracker:
+    """
+    Per-partition bookkeeping for out-of-order completion. Offsets are added in fetch order
+    and completed in any order; the commit position of a partition only advances over a
+    contiguous run of completed offsets, so nothing after an unfinished event is committed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[TopicPartition, deque] = {}
+        self._done: Dict[TopicPartition, set] = {}
+        self._failed: Dict[TopicPartition, int] = {}
+
+    def add(self, tp: TopicPartition, offset: int):
+        with self._lock:
+            self._pending.setdefault(tp, deque()).append(offset)
+
+    def complete(self, tp: TopicPartition, offset: int):
+        with self._lock:
+            self._done.setdefault(tp, set()).add(offset)
+
+    def fail(self, tp: TopicPartition, offset: int):
+        with self._lock:
+            self._failed[tp] = min(self._failed.get(tp, offset), offset)
+
+    def committable(self) -> Dict[TopicPartition, int]:
+        """Next offset to commit for every partition whose contiguous completed run grew."""
+        positions = {}
+        with self._lock:
+            for tp, pending in self._pending.items():
+                done = self._done.get(tp, set())
+                last = None
+                while pending and pending[0] in done:
+                    last = pending.popleft()
+                    done.discard(last)
+                if last is not None:
+                    positions[tp] = last + 1
+        return positions
+
+    def failed(self) -> Dict[TopicPartition, int]:
+        with self._lock:
+            return dict(self._failed)
+
+    def first_pending(self, tp: TopicPartition) -> Optional[int]:
+        with self._lock:
+            pending = self._pending.get(tp)
+            return pending[0] if pending else None
+
+    def reset(self, tp: TopicPartition):
+        with self._lock:
+            self._pending.pop(tp, None)
+            self._done.pop(tp, None)
+            self._failed.pop(tp, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(map(len, self._pending.values()))
+
+
+class KeyedWorkerPool:
+    """
+    N worker threads, each draining its own bounded FIFO queue. Items with the same key
+    always land on the same worker, so they are handled in submission order, while items
+    with different keys run concurrently. A full queue blocks submit (backpressure).
+    """
+
+    def __init__(self, workers: int, handler: Callable, queue_size: int = 1000, name: str = "worker"):
+        self.handler = handler
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"{name}-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"KeyedWorkerPool started ({workers} workers, queue_size={queue_size})")
+
+    @property
+    def size(self) -> int:
+        return len(self._queues)
+
+    def _slot(self, key: Hashable) -> int:
+        # stable across processes, unlike hash() of a str
+        return zlib.crc32(str(key).encode("utf-8")) % len(self._queues)
+
+    def submit(self, key: Hashable, item):
+        self._queues[self._slot(key)].put(item)
+
+    def _run(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    return
+                self.handler(item)
+            except Exception:
+                logger.exception("KeyedWorkerPool handler error")
+            finally:
+                q.task_done()
+
+    def join(self):
+        """Block until every item submitted so far has been handled."""
+        for q in self._queues:
+            q.join()
+
+    def close(self):
+        for q in self._queues:
+            q.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        logger.info("KeyedWorkerPool stopped")
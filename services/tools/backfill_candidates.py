@@ -0,0 +1,70 @@
+# python -m services.tools.backfill_candidates [--batch 500] [--after-id <_id>] [--dry-run]
+"""
+One-off copy of the legacy likes.waiting arrays into the candidates collection, so existing
+users keep their waiting list after the switch to the scored candidates store.
+Legacy ids carry no score; they get LEGACY_SCORE (below any real reciprocal score) and never
+replace an entry the indexer already stored, so the tool can run before or after the new
+indexer is deployed, and again. Each user keeps at most CANDIDATES_TOP_K entries.
+Users are processed in _id order; --after-id resumes an interrupted run.
+"""
+import argparse
+import time
+from pymongo import UpdateOne
+from common.config import settings
+from common.logger import Logger
+from common.mongo_client import mongo
+from services.indexer.mongo_service import merge_candidates
+
+logger = Logger.get_logger(name=__name__)
+
+# reciprocal scores are the sum of two cosines, so they never go below -2
+LEGACY_SCORE = -2.0
+
+
+def backfill(batch: int, after_id: str = None, dry_run: bool = False) -> dict:
+    db = mongo.connect()
+    likes = db[settings.MONGO_COLL_LIKES]
+    candidates = db[settings.MONGO_COLL_CANDIDATES]
+
+    query = {"waiting.0": {"$exists": True}}
+    if after_id:
+        query["_id"] = {"$gt": after_id}
+    cursor = likes.find(query, {"waiting": 1}).sort("_id", 1).batch_size(batch)
+    totals = {"users": 0, "ids": 0}
+    ops, last_id = [], None
+
+    def flush():
+        if ops and not dry_run:
+            candidates.bulk_write(ops, ordered=False)
+        logger.info("backfilled %d users / %d ids (last _id %s)", totals["users"], totals["ids"], last_id)
+        ops.clear()
+
+    for doc in cursor:
+        waiting = dict.fromkeys(doc["waiting"][:settings.CANDIDATES_TOP_K], LEGACY_SCORE)
+        ops.append(UpdateOne({"_id": doc["_id"]},
+                             merge_candidates(waiting, settings.CANDIDATES_TOP_K, keep_existing=True),
+                             upsert=True))
+        totals["users"] += 1
+        totals["ids"] += len(waiting)
+        last_id = doc["_id"]
+        if len(ops) >= batch:
+            flush()
+    flush()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=500, help="users per bulk_write")
+    parser.add_argument("--after-id", default=None, help="resume after this likes _id")
+    parser.add_argument("--dry-run", action="store_true", help="count, write nothing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = backfill(args.batch, args.after_id, args.dry_run)
+    print(f"{totals['users']} users, {totals['ids']} waiting ids in {time.perf_counter() - start:.1f}s"
+          f"{' [dry run]' if args.dry_run else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# python -m services.tools.bench_api_concurrency --requests 2000 --concurrency 200 --latency-ms 50
+"""
+Concurrency of one API worker: GET /waiting_matches/{id} as the async route that awaits
+the native async Mongo client, versus the same handler as a sync `def` on blocking
+pymongo (run by FastAPI in its threadpool, 40 threads by default).
+Mongo is replaced by a local stand-in that answers after --latency-ms, so the numbers
+show scheduling only: requests are driven straight through the ASGI app, no HTTP server.
+With low latency the async side becomes CPU-bound on FastAPI itself (~1 ms per request).
+"""
+import argparse
+import asyncio
+import time
+from fastapi import Depends, FastAPI
+from services.api.dependencies import get_candidates_collection, get_profile_cache
+from services.api.profile_cache import ProfileSummaryCache
+from services.api.routes.waiting_matches import router as waiting_matches_router
+
+PAGE = [{"id": f"p{i}", "score": 1.9 - i / 100} for i in range(10)]
+PROFILE_FIELDS = {"first_name": "a", "last_name": "b", "age": 30, "gender": "female", "location": "x"}
+
+
+class BlockingCollection:
+    """pymongo Collection stand-in: every call holds its thread for `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def aggregate(self, pipeline):
+        time.sleep(self.latency)
+        return [{"page": PAGE}]
+
+    def find(self, query, projection=None):
+        time.sleep(self.latency)
+        return [{"_id": _id, **PROFILE_FIELDS} for _id in query["_id"]["$in"]]
+
+
+class _AsyncCursor:
+    def __init__(self, docs, latency: float):
+        self._docs = docs
+        self._latency = latency
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._latency)
+        for doc in self._docs:
+            yield doc
+
+    async def to_list(self):
+        await asyncio.sleep(self._latency)
+        return self._docs
+
+
+class AsyncCollection:
+    """AsyncCollection stand-in: every call awaits `latency` seconds without holding a thread."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def aggregate(self, pipeline):
+        return _AsyncCursor([{"page": PAGE}], self.latency)
+
+    def find(self, query, projection=None):
+        return _AsyncCursor([{"_id": _id, **PROFILE_FIELDS} for _id in query["_id"]["$in"]], self.latency)
+
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+    app.include_router(waiting_matches_router)
+    async_coll = AsyncCollection(latency)
+    app.dependency_overrides[get_candidates_collection] = lambda: async_coll
+    # max_entries=0: every request goes to the stand-in, which is what is being compared
+    profile_cache = ProfileSummaryCache(async_coll, max_entries=0)
+    app.dependency_overrides[get_profile_cache] = lambda: profile_cache
+
+    blocking_coll = BlockingCollection(latency)
+
+    @app.get("/sync_waiting_matches/{actor_id}")
+    def sync_waiting_matches(actor_id: str, coll: BlockingCollection = Depends(lambda: blocking_coll)):
+        page = coll.aggregate([{"$match": {"_id": actor_id}}])[0]["page"]
+        cursor = coll.find({"_id": {"$in": [c["id"] for c in page]}})
+        return {"waiting": [{"id": doc["_id"], **doc} for doc in cursor]}
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app: FastAPI, prefix: str, requests: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            if await call(app, f"/{prefix}/u{i}") != 200:
+                raise RuntimeError(f"/{prefix} returned an error")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    app = build_app(args.latency_ms / 1000)
+    sync_rps = await run(app, "sync_waiting_matches", args.requests, args.concurrency)
+    async_rps = await run(app, "waiting_matches", args.requests, args.concurrency)
+    # each request makes two Mongo calls, so the ideal is concurrency / (2 * latency)
+    ideal = args.concurrency / (2 * args.latency_ms / 1000)
+    print(f"sync def + blocking pymongo : {sync_rps:8.0f} req/s")
+    print(f"async def + async client    : {async_rps:8.0f} req/s  (x{async_rps / sync_rps:.1f}, ideal {ideal:.0f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
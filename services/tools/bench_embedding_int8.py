@@ -0,0 +1,54 @@
+# python -m services.tools.bench_embedding_int8 --texts 256
+"""
+fp32 vs dynamically quantized int8 CPU inference of the embedding model:
+latency (single text and batched) and cosine agreement between the two vector sets.
+"""
+import argparse
+import random
+import time
+import numpy as np
+from common.config import settings
+from services.indexer.embedding_provider import load_model
+from services.tools.bench_indexer_batch import WORDS
+
+
+def timed_encode(model, texts, batch_size):
+    start = time.perf_counter()
+    for text in texts[:32]:
+        model.encode(text)
+    single_ms = (time.perf_counter() - start) * 1000 / min(len(texts), 32)
+
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(texts)
+    return np.asarray(vectors, dtype=np.float32), single_ms, batch_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    texts = [" ".join(rnd.choices(WORDS, k=rnd.randint(5, 40))) for _ in range(args.texts)]
+
+    fp32, fp32_single, fp32_batch = timed_encode(load_model(args.model), texts, settings.EMBEDDING_ENCODE_BATCH_SIZE)
+    int8, int8_single, int8_batch = timed_encode(load_model(args.model, int8=True), texts,
+                                                  settings.EMBEDDING_ENCODE_BATCH_SIZE)
+
+    fp32 /= np.linalg.norm(fp32, axis=1, keepdims=True)
+    int8 /= np.linalg.norm(int8, axis=1, keepdims=True)
+    agreement = np.sum(fp32 * int8, axis=1)
+    same_top1 = np.mean(np.argmax(fp32 @ fp32.T - 2 * np.eye(len(texts)), axis=1)
+                        == np.argmax(int8 @ int8.T - 2 * np.eye(len(texts)), axis=1))
+
+    print(f"{'':6}{'single ms/text':>16}{'batched ms/text':>17}")
+    print(f"{'fp32':6}{fp32_single:16.2f}{fp32_batch:17.2f}")
+    print(f"{'int8':6}{int8_single:16.2f}{int8_batch:17.2f}")
+    print(f"cosine(fp32, int8): mean={agreement.mean():.4f} min={agreement.min():.4f}")
+    print(f"nearest-neighbour agreement: {same_top1:.1%}")
+
+
+if __name__ == "__main__":
+    main()
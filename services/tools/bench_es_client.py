@@ -0,0 +1,38 @@
+# python -m services.tools.bench_es_client --messages 200
+"""
+Per-message Elasticsearch setup overhead of the indexer:
+before - a fresh client per message (construct + ping + indices.exists), as ElasticService used to do
+after  - the process-wide registry (get_elastic), reused across messages
+"""
+import argparse
+import time
+from common.config import settings
+from common.es_client import Elastic, close_clients, get_elastic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--index", default="male")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        es = Elastic(settings.ES_URL, args.index, pooled=False)
+        es.count()
+        es.close()
+    before = (time.perf_counter() - start) * 1000 / args.messages
+
+    get_elastic(args.index, settings.ES_URL)
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        get_elastic(args.index, settings.ES_URL).count()
+    after = (time.perf_counter() - start) * 1000 / args.messages
+
+    print(f"per-message client : {before:7.2f} ms/message")
+    print(f"pooled registry    : {after:7.2f} ms/message  (overhead saved {before - after:.2f} ms)")
+    close_clients()
+
+
+if __name__ == "__main__":
+    main()
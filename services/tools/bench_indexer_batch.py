@@ -0,0 +1,76 @@
+# python -m services.tools.bench_indexer_batch --profiles 512 [--with-es]
+"""
+Throughput of the indexer hot path: per-profile (2 encode calls + 1 upsert each, refresh per doc)
+versus micro-batched (1 encode call + 1 _bulk request per batch).
+Prints profiles/sec for both paths.
+"""
+import argparse
+import random
+import time
+from common.config import settings
+from services.indexer.embedding_provider import load_model
+
+WORDS = ("torah", "family", "music", "travel", "kind", "quiet", "funny", "books", "learning",
+         "jerusalem", "cooking", "honest", "warm", "serious", "nature", "children", "community")
+BENCH_INDEX = "bench_indexer"
+
+
+def fake_profiles(n: int):
+    rnd = random.Random(42)
+    return [{
+        "unique_id": f"bench-{i}",
+        "free_text_self": " ".join(rnd.choices(WORDS, k=25)),
+        "free_text_for_search": " ".join(rnd.choices(WORDS, k=25)),
+    } for i in range(n)]
+
+
+def run_single(model, profiles, es=None):
+    start = time.perf_counter()
+    for p in profiles:
+        doc = {"text_self_vector": model.encode(p["free_text_self"]).tolist(),
+               "text_for_search_vector": model.encode(p["free_text_for_search"]).tolist()}
+        if es:
+            es.upsert_doc(p["unique_id"], doc, refresh="true")
+    return len(profiles) / (time.perf_counter() - start)
+
+
+def run_batched(model, profiles, batch_size, es=None):
+    start = time.perf_counter()
+    for i in range(0, len(profiles), batch_size):
+        chunk = profiles[i:i + batch_size]
+        texts = [t for p in chunk for t in (p["free_text_self"], p["free_text_for_search"])]
+        vectors = model.encode(texts, batch_size=settings.EMBEDDING_ENCODE_BATCH_SIZE).tolist()
+        if es:
+            es.bulk_upsert([(BENCH_INDEX, p["unique_id"], {"text_self_vector": vectors[2 * j],
+                                                           "text_for_search_vector": vectors[2 * j + 1]})
+                            for j, p in enumerate(chunk)], refresh="true")
+    return len(profiles) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=settings.INDEXER_BATCH_SIZE)
+    parser.add_argument("--with-es", action="store_true", help="also write vectors to a scratch ES index")
+    args = parser.parse_args()
+
+    es = None
+    if args.with_es:
+        from common.es_client import Elastic
+        es = Elastic(settings.ES_URL, BENCH_INDEX)
+
+    model = load_model(settings.EMBEDDING_MODEL_NAME)
+    profiles = fake_profiles(args.profiles)
+
+    single = run_single(model, profiles, es)
+    batched = run_batched(model, profiles, args.batch_size, es)
+    print(f"per-profile : {single:8.1f} profiles/sec")
+    print(f"batched({args.batch_size:>3}): {batched:8.1f} profiles/sec  (x{batched / single:.1f})")
+
+    if es:
+        es.es.indices.delete(index=BENCH_INDEX, ignore_unavailable=True)
+        es.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# python -m services.tools.bench_kafka_producer --messages 5000
+"""
+Producer throughput: blocking send_message (one broker round trip per message)
+versus send_async + a single flush() at the end.
+"""
+import argparse
+import time
+from common.kafka_producer import Producer
+
+TOPIC = "bench.producer"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--compression", default=None)
+    args = parser.parse_args()
+
+    producer = Producer(compression_type=args.compression)
+    if not producer.ready:
+        raise SystemExit("Kafka not reachable")
+    payload = {"actor_id": "a" * 64, "target_id": "b" * 64, "status": "likes"}
+
+    start = time.perf_counter()
+    for i in range(args.messages):
+        producer.send_message(TOPIC, payload, key=i)
+    blocking = args.messages / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(args.messages):
+        producer.send_async(TOPIC, payload, key=i)
+    producer.flush()
+    pipelined = args.messages / (time.perf_counter() - start)
+
+    print(f"blocking send_message : {blocking:10.0f} msg/s")
+    print(f"send_async + flush    : {pipelined:10.0f} msg/s  (x{pipelined / blocking:.1f}, "
+          f"delivered={producer.delivered}, failed={producer.failed})")
+    producer.close()
+
+
+if __name__ == "__main__":
+    main()
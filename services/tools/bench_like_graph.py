@@ -0,0 +1,43 @@
+# python -m services.tools.bench_like_graph --users 200000 --edges 1000000
+"""
+Memory footprint and lookup speed of the match engine's in-memory LikeGraph
+for a random graph (user ids are 64-char hashes, like CreateHash produces).
+"""
+import argparse
+import hashlib
+import random
+import time
+from services.match_engine.like_graph import LikeGraph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--dislike-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    ids = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(args.users)]
+    graph = LikeGraph()
+    start = time.perf_counter()
+    for _ in range(args.edges):
+        status = "dislikes" if rnd.random() < args.dislike_ratio else "likes"
+        graph.apply(rnd.choice(ids), rnd.choice(ids), status)
+    build = time.perf_counter() - start
+
+    pairs = [(rnd.choice(ids), rnd.choice(ids)) for _ in range(100_000)]
+    start = time.perf_counter()
+    for actor, target in pairs:
+        graph.has_blocking_dislike(actor, target) or graph.has_mutual_like(actor, target)
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(pairs)
+
+    stats = graph.stats()
+    print(f"users={stats['users']} edges={stats['edges']} build={build:.1f}s")
+    print(f"memory={stats['memory_mb']} MB  ->  {stats['mb_per_million_edges']} MB per million edges "
+          f"(incl. {args.users} interned ids)")
+    print(f"decision lookup: {lookup_us:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
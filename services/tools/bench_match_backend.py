@@ -0,0 +1,82 @@
+# python -m services.tools.bench_match_backend --sizes 10000 100000 1000000 [--with-es 10000 100000]
+"""
+Top-k reciprocal match latency of the in-memory NumPy backend (float32 / float16) at several
+profile counts, optionally against the ES script_score path loaded with the same vectors.
+Vectors are random unit vectors - latency does not depend on their content.
+"""
+import argparse
+import time
+import numpy as np
+from common.config import settings
+from services.indexer.match_backend import VectorMatrix
+
+QUERIES = 50
+BENCH_INDEX = "bench_match_backend"
+
+
+def random_unit(rng, n, dim):
+    v = rng.standard_normal((n, dim), dtype=np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def bench_memory(n, dim, dtype, k, rng):
+    matrix = VectorMatrix(dim, dtype, initial_capacity=n)
+    for start in range(0, n, 100_000):
+        count = min(100_000, n - start)
+        matrix.upsert([f"p{i}" for i in range(start, start + count)],
+                      random_unit(rng, count, dim), random_unit(rng, count, dim))
+    queries = random_unit(rng, 2 * QUERIES, dim)
+    begin = time.perf_counter()
+    for i in range(QUERIES):
+        matrix.top_k(queries[2 * i], queries[2 * i + 1], k)
+    return (time.perf_counter() - begin) * 1000 / QUERIES
+
+
+def bench_es(n, dim, k, rng):
+    from common.es_client import Elastic
+    from common.es_mappings import profile_index_body
+    from services.indexer.elastic_service import ElasticService
+
+    # a scratch index with the profile mapping, so the live gender indices are never touched
+    es = Elastic(settings.ES_URL, BENCH_INDEX, create_if_missing=False)
+    es.es.indices.delete(index=BENCH_INDEX, ignore_unavailable=True)
+    es.es.indices.create(index=BENCH_INDEX, **profile_index_body())
+    try:
+        for start in range(0, n, 5_000):
+            count = min(5_000, n - start)
+            self_v, search_v = random_unit(rng, count, dim), random_unit(rng, count, dim)
+            es.bulk_upsert([(BENCH_INDEX, f"bench-{start + i}", {"text_self_vector": self_v[i].tolist(),
+                                                                 "text_for_search_vector": search_v[i].tolist()})
+                            for i in range(count)])
+        es.es.indices.refresh(index=BENCH_INDEX)
+        esr = ElasticService("male")
+        queries = random_unit(rng, 2 * QUERIES, dim)
+        begin = time.perf_counter()
+        for i in range(QUERIES):
+            esr.match_search((queries[2 * i].tolist(), queries[2 * i + 1].tolist()), size=k, mode="exact",
+                             target_index=BENCH_INDEX)
+        return (time.perf_counter() - begin) * 1000 / QUERIES
+    finally:
+        es.es.indices.delete(index=BENCH_INDEX, ignore_unavailable=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--with-es", type=int, nargs="*", default=[],
+                        help="sizes to also run against ES (in a scratch index, deleted afterwards)")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dim = settings.EMBEDDING_DIM
+    print(f"{'profiles':>10}{'numpy f32 ms':>14}{'numpy f16 ms':>14}{'ES ms':>10}")
+    for n in args.sizes:
+        f32 = bench_memory(n, dim, np.float32, args.k, rng)
+        f16 = bench_memory(n, dim, np.float16, args.k, rng)
+        es = f"{bench_es(n, dim, args.k, rng):10.2f}" if n in args.with_es else f"{'-':>10}"
+        print(f"{n:>10}{f32:14.2f}{f16:14.2f}{es}")
+
+
+if __name__ == "__main__":
+    main()
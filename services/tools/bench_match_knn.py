@@ -0,0 +1,65 @@
+# python -m services.tools.bench_match_knn --index male --queries 100 --k 10
+"""
+Recall@k and latency of the knn match path against the exact script_score path.
+Query profiles are sampled from Mongo (gender of --index) and embedded through the embedding
+cache, since vectors are not kept in _source; matches come from the opposite-gender index.
+"""
+import argparse
+import statistics
+import time
+from common.config import settings
+from common.mongo_client import mongo
+from services.indexer import embedding_provider
+from services.indexer.elastic_service import ElasticService
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result or [], (time.perf_counter() - start) * 1000
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index", default="male", choices=["male", "female"])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--knn-k", type=int, nargs="+", default=[settings.MATCH_KNN_K])
+    args = parser.parse_args()
+
+    esr = ElasticService(args.index)
+    sample = list(mongo.get_collection(settings.MONGO_COLL_PROFILESS).aggregate([
+        {"$match": {"gender": args.index.capitalize()}},
+        {"$sample": {"size": args.queries}},
+        {"$project": {"free_text_self": 1, "free_text_for_search": 1}},
+    ]))
+    vectors = embedding_provider.encode([t for d in sample for t in (d["free_text_self"], d["free_text_for_search"])])
+    queries = [(vectors[2 * i], vectors[2 * i + 1]) for i in range(len(sample))]
+
+    exact, exact_ms = [], []
+    for query_vectors in queries:
+        hits, ms = timed(lambda: esr.match_search(query_vectors, size=args.k, mode="exact"))
+        exact.append({hit_id for hit_id, _ in hits})
+        exact_ms.append(ms)
+    print(f"{'mode':<12}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'exact':<12}{1.0:>10.3f}{percentile(exact_ms, 0.5):>10.1f}{percentile(exact_ms, 0.95):>10.1f}")
+
+    for knn_k in args.knn_k:
+        settings.MATCH_KNN_K = knn_k
+        recalls, knn_ms = [], []
+        for query_vectors, truth in zip(queries, exact):
+            hits, ms = timed(lambda: esr.match_search(query_vectors, size=args.k, mode="knn"))
+            knn_ms.append(ms)
+            if truth:
+                recalls.append(len(truth & {hit_id for hit_id, _ in hits}) / len(truth))
+        print(f"{'knn k=' + str(knn_k):<12}{statistics.mean(recalls) if recalls else 0:>10.3f}"
+              f"{percentile(knn_ms, 0.5):>10.1f}{percentile(knn_ms, 0.95):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
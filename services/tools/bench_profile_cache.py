@@ -0,0 +1,68 @@
+# python -m services.tools.bench_profile_cache --profiles 100000 --requests 20000 --latency-ms 2
+"""
+Waiting-list hydration through ProfileSummaryCache versus straight $in queries.
+Pages of --page ids are drawn Zipf-distributed over --profiles ids (a few popular profiles sit
+in many users' lists); the profiles collection is a stand-in answering after --latency-ms.
+Prints hit rate, $in queries issued and get_many p50/p99 of both runs.
+A page still costs one round trip if any of its ids misses, so latency only drops once whole
+pages are hot: with 100k profiles and pages of 20, zipf 1.2 gives a 0.77 hit rate but ~1 query
+per page, zipf 1.5 a 0.94 hit rate with p50 at memory speed and 44% of the queries.
+"""
+import argparse
+import asyncio
+import numpy as np
+from services.api.profile_cache import ProfileSummaryCache
+
+PROFILE_FIELDS = {"first_name": "a", "last_name": "b", "age": 30, "gender": "Female", "location": "x"}
+
+
+class _Cursor:
+    def __init__(self, docs, latency: float):
+        self._docs = docs
+        self._latency = latency
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._latency)
+        for doc in self._docs:
+            yield doc
+
+
+class ProfilesCollection:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.queries = 0
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        return _Cursor([{"_id": _id, **PROFILE_FIELDS} for _id in query["_id"]["$in"]], self.latency)
+
+
+async def run(cache: ProfileSummaryCache, pages) -> dict:
+    for page in pages:
+        await cache.get_many(page)
+    return cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=20)
+    parser.add_argument("--zipf", type=float, default=1.2)
+    parser.add_argument("--max-entries", type=int, default=20_000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ranks = rng.zipf(args.zipf, size=(args.requests, args.page)) % args.profiles
+    pages = [[f"p{r}" for r in row] for row in ranks]
+
+    for name, max_entries in (("no cache", 0), ("cache", args.max_entries)):
+        coll = ProfilesCollection(args.latency_ms / 1000)
+        stats = asyncio.run(run(ProfileSummaryCache(coll, max_entries=max_entries, ttl_s=3600), pages))
+        print(f"{name:<10} hit_rate={stats['hit_rate']:.3f}  queries={coll.queries:>6}  "
+              f"p50={stats['get_many_p50_ms']:.2f} ms  p99={stats['get_many_p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
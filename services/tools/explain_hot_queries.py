@@ -0,0 +1,99 @@
+# python -m services.tools.explain_hot_queries [--ensure]
+"""
+Query-plan check of the hot Mongo queries: runs explain() on each query shape the services
+issue and exits with status 1 if any winning plan contains a COLLSCAN.
+--ensure creates the required indexes (common/mongo_indexes.py) first.
+Run it against a database that has the collections; on a missing collection Mongo answers
+with an EOF plan, which proves nothing.
+"""
+import argparse
+import sys
+from typing import Iterator, List
+from common.config import settings
+from common.mongo_client import mongo
+from common.mongo_indexes import ensure_indexes
+from services.api.profile_cache import SUMMARY_PROJECTION
+from services.api.routes.waiting_matches import page_pipeline
+
+SAMPLE_ID = "__explain__"
+
+
+def hot_queries(db) -> list:
+    """(name, explain thunk) per hot query shape, mirroring the code that issues it."""
+    likes = db[settings.MONGO_COLL_LIKES]
+    edges = db[settings.MONGO_COLL_FEEDBACK_EDGES]
+    id_field = settings.PROFILE_ID_FIELD
+    return [
+        ("MongoReader.has_mutual_like", lambda: likes.find(
+            {id_field: SAMPLE_ID, settings.LIKES_FIELD: SAMPLE_ID}, {id_field: 1}).limit(1).explain()),
+        ("MongoReader.has_blocking_dislike", lambda: likes.find(
+            {id_field: SAMPLE_ID, settings.DISLIKES_FIELD: SAMPLE_ID}, {id_field: 1}).limit(1).explain()),
+        ("MongoReader.fetch_relations", lambda: likes.find(
+            {id_field: {"$in": [SAMPLE_ID, SAMPLE_ID + "2"]}}).explain()),
+        ("EdgeReader.has_mutual_like", lambda: edges.find(
+            {"actor_id": SAMPLE_ID, "target_id": SAMPLE_ID, "status": "likes"}, {"_id": 1}).limit(1).explain()),
+        ("EdgeReader.fetch_relations", lambda: edges.find(
+            {"actor_id": {"$in": [SAMPLE_ID, SAMPLE_ID + "2"]}, "target_id": {"$in": [SAMPLE_ID]},
+             "status": {"$in": ["likes", "dislikes"]}}).explain()),
+        ("login.find_user_by_email", lambda: db[settings.MONGO_COLL_USERS].find(
+            {"email": SAMPLE_ID}).limit(1).explain()),
+        ("ProfileSummaryCache.get_many", lambda: db[settings.MONGO_COLL_PROFILESS].find(
+            {"_id": {"$in": [SAMPLE_ID, SAMPLE_ID + "2"]}}, SUMMARY_PROJECTION).explain()),
+        ("waiting_matches.page", lambda: db.command(
+            "aggregate", settings.MONGO_COLL_CANDIDATES, pipeline=page_pipeline(SAMPLE_ID, 20, None), explain=True)),
+        ("add_person.export_resume", lambda: db[settings.MONGO_COLL_PROFILESS].find(
+            {"_id": {"$gt": SAMPLE_ID}}, {"photo": 0}).sort("_id", 1).limit(1000).explain()),
+    ]
+
+
+def winning_plans(explain) -> Iterator[dict]:
+    """Every winningPlan in an explain document (find, aggregate $cursor stages, shards)."""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            elif key != "rejectedPlans":
+                yield from winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from winning_plans(item)
+
+
+def plan_stages(plan) -> List[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ensure", action="store_true", help="create the required indexes first")
+    args = parser.parse_args()
+
+    db = mongo.connect()
+    if args.ensure:
+        ensure_indexes(db)
+
+    failed = []
+    for name, explain in hot_queries(db):
+        stages = [stage for plan in winning_plans(explain()) for stage in plan_stages(plan)]
+        scan = "COLLSCAN" in stages
+        if scan:
+            failed.append(name)
+        print(f"{'FAIL' if scan else 'ok':<6}{name:<36}{' > '.join(stages) or '-'}")
+
+    if failed:
+        print(f"\n{len(failed)} hot queries scan a whole collection: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
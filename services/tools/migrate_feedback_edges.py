@@ -0,0 +1,75 @@
+# python -m services.tools.migrate_feedback_edges [--batch 1000] [--after-id <_id>] [--dry-run]
+"""
+Copy feedback from the arrays layout (one likes document per actor) to the edge-per-document
+layout (FEEDBACK_STORAGE_MODE=edges). Safe to run any number of times:
+  1. run it while every service is still in arrays mode,
+  2. switch FEEDBACK_STORAGE_MODE=edges on the API, indexer and match engine,
+  3. run it again - it fills in what was written to the arrays in between; edges the API has
+     written in edges mode since are never overwritten (see migrated_edge_update).
+Actors are migrated in _id order; --after-id resumes an interrupted run. The arrays are left
+in place - drop them once nothing reads them.
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from common.config import settings
+from common.feedback_edges import edge_filter, migrated_edge_update, statuses_of
+from common.logger import Logger
+from common.mongo_client import mongo
+from common.mongo_indexes import ensure_indexes
+
+logger = Logger.get_logger(name=__name__)
+
+
+def migrate(batch: int, after_id: str = None, dry_run: bool = False) -> dict:
+    db = mongo.connect()
+    if not dry_run:
+        # the unique (actor_id, target_id) index is what makes the upserts below idempotent
+        ensure_indexes(db)
+    likes = db[settings.MONGO_COLL_LIKES]
+    edges = db[settings.MONGO_COLL_FEEDBACK_EDGES]
+
+    query = {"_id": {"$gt": after_id}} if after_id else {}
+    cursor = likes.find(query, {settings.PROFILE_ID_FIELD: 1, "likes": 1, "dislikes": 1, "waiting": 1}) \
+        .sort("_id", 1).batch_size(batch)
+    totals = {"actors": 0, "edges": 0, "upserted": 0}
+    ops, last_id = [], None
+
+    def flush():
+        if ops and not dry_run:
+            res = edges.bulk_write(ops, ordered=False)
+            totals["upserted"] += res.upserted_count
+        logger.info("migrated %d actors / %d edges (last _id %s)", totals["actors"], totals["edges"], last_id)
+        ops.clear()
+
+    now = datetime.now(timezone.utc)
+    for doc in cursor:
+        actor_id = doc.get(settings.PROFILE_ID_FIELD) or doc["_id"]
+        statuses = statuses_of(doc)
+        for target_id, status in statuses.items():
+            ops.append(UpdateOne(edge_filter(actor_id, target_id), migrated_edge_update(status, now), upsert=True))
+        totals["actors"] += 1
+        totals["edges"] += len(statuses)
+        last_id = doc["_id"]
+        if len(ops) >= batch:
+            flush()
+    flush()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=1000, help="edges per bulk_write")
+    parser.add_argument("--after-id", default=None, help="resume after this likes _id")
+    parser.add_argument("--dry-run", action="store_true", help="count, write nothing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = migrate(args.batch, args.after_id, args.dry_run)
+    print(f"{totals['actors']} actors, {totals['edges']} edges ({totals['upserted']} new) "
+          f"in {time.perf_counter() - start:.1f}s{' [dry run]' if args.dry_run else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# python -m services.tools.reindex_profiles --version profiles_v2 [--gender male] [--delete-old]
+"""
+Blue/green rebuild of the profile (gender) indices with the current template.
+
+Vectors are excluded from _source, so _reindex cannot copy them; the new index is rebuilt
+from the Mongo profiles collection instead (embeddings come from the embedding cache, so
+this is cheap for already-seen texts). Steps per gender alias:
+  1. apply the index template, create <alias>_<version> with replicas=0 / refresh off
+  2. bulk load every profile of that gender from Mongo
+  3. restore replicas / refresh_interval, catch up profiles created meanwhile
+  4. atomically move the alias (and ES_ALIAS_PROFILES) to the new index, catch up again
+The indexer keeps writing through the alias the whole time, so there is no downtime.
+The enricher's filter fields (location_norm, age_bucket, age) are copied from the Mongo profile,
+so this is also how indices created before those fields existed get them populated.
+"""
+import argparse
+import time
+from elasticsearch.helpers import scan
+from common.config import settings
+from common.es_client import Elastic, close_clients
+from common.es_mappings import (PROFILE_FILTER_MAPPINGS, PROFILE_GENDER_ALIASES, PROFILE_TEMPLATE_NAME,
+                                profile_index_body, profile_index_patterns, versioned_index_name)
+from common.logger import Logger
+from common.mongo_client import mongo
+from services.indexer import embedding_provider
+from services.indexer.match_service import filter_fields
+
+logger = Logger.get_logger(name=__name__)
+CHUNK = 500
+
+
+def indexed_ids(es: Elastic, index: str) -> set:
+    return {hit["_id"] for hit in scan(es.es, index=index, query={"query": {"match_all": {}}}, _source=False)}
+
+
+def load_profiles(es: Elastic, index: str, gender: str, skip_ids: set = None) -> int:
+    profiles = mongo.get_collection(settings.MONGO_COLL_PROFILESS)
+    cursor = profiles.find({"gender": gender.capitalize()},
+                           {"_id": 1, "free_text_self": 1, "free_text_for_search": 1,
+                            **{field: 1 for field in PROFILE_FILTER_MAPPINGS}}).batch_size(CHUNK)
+    loaded = 0
+    chunk = []
+    for doc in cursor:
+        if skip_ids and doc["_id"] in skip_ids:
+            continue
+        chunk.append(doc)
+        if len(chunk) >= CHUNK:
+            loaded += write_chunk(es, index, chunk)
+            chunk = []
+    if chunk:
+        loaded += write_chunk(es, index, chunk)
+    return loaded
+
+
+def write_chunk(es: Elastic, index: str, docs: list) -> int:
+    texts = [t for d in docs for t in (d["free_text_self"], d["free_text_for_search"])]
+    vectors = embedding_provider.encode(texts)
+    es.bulk_upsert([(index, d["_id"], {"id": d["_id"],
+                                       "text_self_vector": vectors[2 * i],
+                                       "text_for_search_vector": vectors[2 * i + 1],
+                                       **filter_fields(d)})
+                    for i, d in enumerate(docs)])
+    return len(docs)
+
+
+def reindex(es: Elastic, alias: str, version: str, delete_old: bool):
+    new_index = versioned_index_name(alias, version)
+    if es.es.indices.exists(index=new_index):
+        raise SystemExit(f"{new_index} already exists - pick another --version")
+
+    body = profile_index_body()
+    es.es.indices.create(index=new_index, settings={**body["settings"], "number_of_replicas": 0,
+                                                    "refresh_interval": "-1"})
+    start = time.perf_counter()
+    loaded = load_profiles(es, new_index, alias)
+    es.es.indices.put_settings(index=new_index, settings={
+        "number_of_replicas": body["settings"]["number_of_replicas"],
+        "refresh_interval": body["settings"]["refresh_interval"]})
+    es.es.indices.refresh(index=new_index)
+    loaded += load_profiles(es, new_index, alias, skip_ids=indexed_ids(es, new_index))
+    logger.info(f"{new_index}: loaded {loaded} profiles in {time.perf_counter() - start:.1f}s")
+
+    old_indices = es.swap_alias(alias, new_index, extra_aliases=[settings.ES_ALIAS_PROFILES])
+    es.es.indices.refresh(index=new_index)
+    caught_up = load_profiles(es, new_index, alias, skip_ids=indexed_ids(es, new_index))
+    logger.info(f"alias '{alias}' now on {new_index} (caught up {caught_up} late profiles)")
+
+    if delete_old:
+        for old in old_indices:
+            if old != alias and es.es.indices.exists(index=old):
+                es.es.indices.delete(index=old)
+                logger.info(f"deleted old index {old}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", required=True, help="suffix of the new concrete index, e.g. profiles_v2")
+    parser.add_argument("--gender", choices=PROFILE_GENDER_ALIASES, nargs="*", default=PROFILE_GENDER_ALIASES)
+    parser.add_argument("--delete-old", action="store_true")
+    args = parser.parse_args()
+
+    es = Elastic(settings.ES_URL, create_if_missing=False)
+    es.put_index_template(PROFILE_TEMPLATE_NAME, profile_index_patterns(), profile_index_body())
+    for alias in args.gender:
+        reindex(es, alias, args.version, args.delete_old)
+    close_clients()
+
+
+if __name__ == "__main__":
+    main()
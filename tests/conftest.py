@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the match engine runs from its own directory and imports its modules top-level
+for path in (ROOT, os.path.join(ROOT, "services", "match_engine")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,65 @@
+import asyncio
+from unittest import mock
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("uvicorn")  # imported by the route module
+from services.api.routes.add_a_new_person import PersonModel, add_person, export_projection, ndjson_lines  # noqa: E402
+
+
+class FailingCursor:
+    """Yields the given documents, then fails the way a dropped Mongo connection does."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+        raise ConnectionError("connection reset")
+
+    async def close(self):
+        self.closed = True
+
+
+def test_failure_mid_export_flushes_then_aborts():
+    cursor = FailingCursor([{"_id": "a"}, {"_id": "b"}])
+    received = []
+
+    async def consume():
+        async for chunk in ndjson_lines(cursor, chunk_bytes=1 << 20):
+            received.append(chunk)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(consume())
+    assert b"".join(received) == b'{"_id": "a"}\n{"_id": "b"}\n'
+    assert cursor.closed
+
+
+def test_export_projection():
+    assert export_projection(None) == {"photo": 0}
+    assert export_projection(" email, age ,,") == {"email": 1, "age": 1}
+    for fields in ("$where", "a..b", "a.", "a,a.b", "x,a.b.c,a.b"):
+        with pytest.raises(HTTPException) as e:
+            export_projection(fields)
+        assert e.value.status_code == 400
+
+
+def test_duplicate_person_stores_no_photo():
+    class Mongo:
+        async def check_exists_by_id(self, coll, _id):
+            return True
+
+    person = PersonModel(email="a@b.c", first_name="a", last_name="b", age=30, location="x", gender="Male",
+                         marital_status="Single", origin="תימני", sector="ליטאי", free_text_self="",
+                         free_text_for_search="")
+    photos, producer = mock.Mock(), mock.Mock()
+    upload = mock.Mock(filename="p.jpg", content_type="image/jpeg")
+    result = asyncio.run(add_person(person, upload, Mongo(), producer, photos))
+    assert "error" in result
+    photos.put.assert_not_called()
+    producer.send_async.assert_not_called()
@@ -0,0 +1,118 @@
+import pytest
+from fastapi import HTTPException
+from services.api.routes.waiting_matches import decode_cursor, encode_cursor, page_pipeline
+from services.indexer.mongo_service import merge_candidates
+
+MISSING = object()
+
+
+def evaluate(expr, doc, this=MISSING):
+    """The aggregation operators the candidate pipelines use, evaluated in Python."""
+    if isinstance(expr, str):
+        if expr.startswith("$$this."):
+            return this.get(expr[len("$$this."):], MISSING)
+        if expr.startswith("$"):
+            path = expr[1:].split(".")
+            value = doc.get(path[0], MISSING)
+            if len(path) == 2 and isinstance(value, list):
+                return [item[path[1]] for item in value]
+            return value
+        return expr
+    if isinstance(expr, list):
+        return [evaluate(e, doc, this) for e in expr]
+    if not isinstance(expr, dict) or not expr or not next(iter(expr)).startswith("$"):
+        return expr
+    (op, arg), = expr.items()
+    if op == "$literal":
+        return arg
+    if op == "$filter":
+        return [item for item in evaluate(arg["input"], doc, this) if evaluate(arg["cond"], doc, item)]
+    if op == "$sortArray":
+        items = evaluate(arg["input"], doc, this)
+        for field, direction in reversed(list(arg["sortBy"].items())):
+            items = sorted(items, key=lambda item: item[field], reverse=direction < 0)
+        return items
+    args = [evaluate(a, doc, this) for a in arg]
+    if op == "$ifNull":
+        return args[1] if args[0] in (MISSING, None) else args[0]
+    if op == "$slice":
+        return args[0][:args[1]]
+    if op == "$concatArrays":
+        return [item for array in args for item in array]
+    if op == "$in":
+        return args[0] in args[1]
+    if op == "$not":
+        return not args[0]
+    if op == "$or":
+        return any(args)
+    if op == "$and":
+        return all(args)
+    if op == "$lt":
+        return args[0] < args[1]
+    if op == "$gt":
+        return args[0] > args[1]
+    if op == "$eq":
+        return args[0] == args[1]
+    raise NotImplementedError(op)
+
+
+def apply_update(pipeline, doc):
+    doc = dict(doc)
+    for stage in pipeline:
+        doc.update({field: evaluate(expr, doc) for field, expr in stage["$set"].items()})
+    return doc
+
+
+def run_page(candidates, limit, cursor=None):
+    """page_pipeline on one candidates document -> (page, next cursor), as the route computes them."""
+    match, project = page_pipeline("u", limit, decode_cursor(cursor) if cursor else None)
+    assert match == {"$match": {"_id": "u"}}
+    page = evaluate(project["$project"]["page"], {"candidates": candidates})
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def test_cursor_round_trip():
+    for candidate in ({"id": "p1", "score": 1.2345678901234567}, {"id": "äö/+=", "score": -0.5},
+                      {"id": "x", "score": 0.0}):
+        assert decode_cursor(encode_cursor(candidate)) == (candidate["score"], candidate["id"])
+
+
+@pytest.mark.parametrize("cursor", ["@@", "bm9wZQ", encode_cursor({"id": "a", "score": 1})[:-2]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_paging_across_equal_scores():
+    # many ties, so page boundaries fall inside runs of equal scores
+    candidates = sorted(({"id": f"p{i:02d}", "score": float(i % 3)} for i in range(20)),
+                        key=lambda c: (-c["score"], c["id"]))
+    for limit in (1, 3, 7, 20, 25):
+        seen, cursor = [], None
+        while True:
+            page, cursor = run_page(candidates, limit, cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert seen == candidates
+
+
+def test_merge_replaces_sorts_and_truncates_to_top_k():
+    doc = {"candidates": [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.5}, {"id": "c", "score": 0.1}]}
+    doc = apply_update(merge_candidates({"b": 1.5, "d": 0.5, "e": 0.05}, top_k=4), doc)
+    assert doc["candidates"] == [{"id": "b", "score": 1.5}, {"id": "a", "score": 0.9},
+                                 {"id": "d", "score": 0.5}, {"id": "c", "score": 0.1}]
+    assert "updated_at" in doc
+
+
+def test_merge_into_a_new_document():
+    doc = apply_update(merge_candidates({"x": 0.2, "y": 0.2}, top_k=1), {})
+    assert doc["candidates"] == [{"id": "x", "score": 0.2}]
+
+
+def test_merge_keep_existing_never_overwrites_a_score():
+    doc = {"candidates": [{"id": "a", "score": 0.9}]}
+    doc = apply_update(merge_candidates({"a": -2.0, "b": -2.0}, top_k=10, keep_existing=True), doc)
+    assert doc["candidates"] == [{"id": "a", "score": 0.9}, {"id": "b", "score": -2.0}]
@@ -0,0 +1,35 @@
+import numpy as np
+from services.indexer.embedding_cache import DiskVectorStore
+
+DIM = 4
+
+
+def vec(n):
+    return np.full(DIM, n, dtype=np.float32)
+
+
+def test_rows_survive_a_reopen(tmp_path):
+    store = DiskVectorStore(str(tmp_path), DIM, initial_capacity=2)
+    store.put_many([("a", vec(1)), ("b", vec(2)), ("a", vec(9))])
+    store.put_many([("c", vec(3)), ("b", vec(9))])
+    store.close()
+    store = DiskVectorStore(str(tmp_path), DIM)
+    assert [store.get(key)[0] for key in "abc"] == [1, 2, 3]
+
+
+def test_duplicate_and_torn_keys_do_not_shift_rows(tmp_path):
+    store = DiskVectorStore(str(tmp_path), DIM)
+    store.put_many([("a", vec(1)), ("b", vec(2)), ("c", vec(3))])
+    store.close()
+    keys = tmp_path / "keys.txt"
+    # a duplicated line before c, and a key torn by a crash mid-append
+    keys.write_text("a\nb\nb\nc\nd")
+    store = DiskVectorStore(str(tmp_path), DIM)
+    assert keys.read_text() == "a\nb\nb\nc\n"
+    assert store.get("d") is None
+    # c is line 3 now, and row 3 was never written
+    assert store.get("c")[0] == 0
+    store.put_many([("e", vec(5))])
+    store.close()
+    store = DiskVectorStore(str(tmp_path), DIM)
+    assert [store.get(key)[0] for key in "abe"] == [1, 2, 5]
@@ -0,0 +1,31 @@
+import io
+from unittest import mock
+from PIL import Image
+from common.blob_store import LocalBlobStore
+from services.enricher.enricher import Enricher
+
+
+class InlinePool:
+    def submit(self, fn, *args):
+        future = mock.Mock()
+        future.result.return_value = fn(*args)
+        return future
+
+
+def jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (64, 48), "red").save(out, format="JPEG")
+    return out.getvalue()
+
+
+def test_malformed_legacy_photo_only_loses_its_photo(tmp_path):
+    with mock.patch("services.enricher.enricher.Producer"):
+        enricher = Enricher(photos=LocalBlobStore(str(tmp_path)), pool=InlinePool())
+    good = {"unique_id": "good", "photo_ref": enricher.photos.put(io.BytesIO(jpeg()), "image/jpeg").ref}
+    bad = {"unique_id": "bad", "photo": "not base64!"}
+
+    thumbs = enricher.thumbnails([bad, good])
+
+    assert thumbs[0] == {}
+    assert "photo" not in bad and bad["photo_ref"] is None
+    assert set(thumbs[1]) == set(enricher.sizes)
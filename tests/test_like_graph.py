@@ -0,0 +1,41 @@
+import threading
+from like_graph import LikeGraph
+
+
+def test_snapshot_while_workers_apply(tmp_path):
+    graph = LikeGraph()
+    errors = []
+
+    def worker(n):
+        # new actors keep arriving, so the dicts grow while the snapshot iterates them
+        try:
+            for i in range(30_000):
+                graph.apply(f"u{n}-{i // 3}", f"t{i % 997}", "likes" if i % 3 else "dislikes")
+        except Exception as e:  # pragma: no cover - what the test guards against
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    snapshots = 0
+    while any(t.is_alive() for t in threads):
+        graph.save_snapshot(str(tmp_path / "graph.snapshot"), {"feedbacks:0": snapshots})
+        snapshots += 1
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert snapshots > 0
+    restored = LikeGraph()
+    assert restored.load_snapshot(str(tmp_path / "graph.snapshot")) == {"feedbacks:0": snapshots - 1}
+
+
+def test_snapshot_round_trip(tmp_path):
+    graph = LikeGraph()
+    graph.apply("a", "b", "likes")
+    graph.apply("b", "a", "dislikes")
+    graph.save_snapshot(str(tmp_path / "s"), {})
+    restored = LikeGraph()
+    restored.load_snapshot(str(tmp_path / "s"))
+    assert restored.has_mutual_like("b", "a")
+    assert restored.has_blocking_dislike("a", "b")
@@ -0,0 +1,18 @@
+from unittest import mock
+from services.indexer import elastic_service, match_backend
+from services.indexer.elastic_service import RECIPROCAL_SCORE_OFFSET, ElasticService
+
+
+def test_search_scores_the_given_vectors_against_the_other_gender():
+    es = mock.Mock()
+    es.search.return_value = {"hits": {"hits": [{"_id": "f1", "_score": RECIPROCAL_SCORE_OFFSET + 1.5}]}}
+    with mock.patch.object(elastic_service, "get_elastic", return_value=es), \
+            mock.patch.object(match_backend, "get_elastic_service", side_effect=ElasticService), \
+            mock.patch.object(match_backend, "refresh_scheduler"):
+        hits = match_backend.ElasticMatchBackend().search("male", "m1", ([0.1, 0.2], [0.3, 0.4]), size=5)
+    assert hits == [("f1", 1.5)]
+    es.get_doc.assert_not_called()
+    kwargs = es.search.call_args.kwargs
+    assert kwargs["index"] == "female" and kwargs["size"] == 5
+    assert kwargs["query"]["script_score"]["script"]["params"] == {
+        "query_offer_vector": [0.1, 0.2], "query_search_vector": [0.3, 0.4]}
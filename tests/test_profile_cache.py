@@ -0,0 +1,13 @@
+from unittest import mock
+from services.api import profile_cache
+from services.api.profile_cache import ProfileCacheInvalidator
+
+
+def test_invalidator_group_never_commits():
+    with mock.patch.object(profile_cache, "Consumer") as consumer:
+        consumer.return_value.ready = False
+        ProfileCacheInvalidator(cache=mock.Mock(), topics=["profiles"]).start()
+    args, kwargs = consumer.call_args
+    assert args[0] == ["profiles"]
+    assert kwargs["auto_offset_reset"] == "latest"
+    assert kwargs["enable_auto_commit"] is False
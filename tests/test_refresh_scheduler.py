@@ -0,0 +1,18 @@
+from unittest import mock
+from services.indexer import elastic_service
+from services.indexer.elastic_service import RefreshScheduler
+
+
+def test_written_indices_are_refreshed_before_search():
+    client = mock.Mock()
+    scheduler = RefreshScheduler(policy="batch", interval_ms=60_000)
+    with mock.patch.object(elastic_service, "get_client", return_value=client):
+        scheduler.written(["male"])
+        scheduler.maybe_refresh()          # first refresh of the interval
+        scheduler.written(["male", "female"])
+        scheduler.maybe_refresh()          # inside the interval: deferred
+        assert client.indices.refresh.call_count == 1
+        scheduler.before_search()          # but a search must see the batch
+        scheduler.before_search()          # and only once
+    client.indices.refresh.assert_called_with(index="female,male")
+    assert client.indices.refresh.call_count == 2
@@ -0,0 +1,65 @@
+import threading
+from kafka import TopicPartition
+from worker_pool import KeyedWorkerPool, OffsetTracker
+
+TP = TopicPartition("feedbacks", 0)
+OTHER = TopicPartition("feedbacks", 1)
+
+
+def test_commit_position_stops_at_the_first_unfinished_offset():
+    tracker = OffsetTracker()
+    for offset in (10, 11, 12, 13):
+        tracker.add(TP, offset)
+    tracker.complete(TP, 11)
+    tracker.complete(TP, 13)
+    assert tracker.committable() == {}
+    tracker.complete(TP, 10)
+    assert tracker.committable() == {TP: 12}
+    assert tracker.committable() == {}
+    tracker.complete(TP, 12)
+    assert tracker.committable() == {TP: 14}
+    assert tracker.in_flight() == 0
+
+
+def test_partitions_are_independent():
+    tracker = OffsetTracker()
+    tracker.add(TP, 0)
+    tracker.add(OTHER, 5)
+    tracker.complete(OTHER, 5)
+    assert tracker.committable() == {OTHER: 6}
+    assert tracker.first_pending(TP) == 0
+
+
+def test_failure_keeps_the_lowest_offset_until_reset():
+    tracker = OffsetTracker()
+    for offset in range(3):
+        tracker.add(TP, offset)
+    tracker.complete(TP, 0)
+    tracker.fail(TP, 2)
+    tracker.fail(TP, 1)
+    assert tracker.failed() == {TP: 1}
+    assert tracker.committable() == {TP: 1}
+    assert tracker.first_pending(TP) == 1
+    tracker.reset(TP)
+    assert tracker.failed() == {} and tracker.first_pending(TP) is None
+
+
+def test_pool_keeps_per_key_order():
+    seen = {}
+    lock = threading.Lock()
+
+    def handle(item):
+        key, n = item
+        with lock:
+            seen.setdefault(key, []).append(n)
+
+    pool = KeyedWorkerPool(4, handle, queue_size=10, name="test")
+    try:
+        for n in range(200):
+            key = f"k{n % 7}"
+            pool.submit(key, (key, n))
+        pool.join()
+    finally:
+        pool.close()
+    assert all(values == sorted(values) for values in seen.values())
+    assert sum(map(len, seen.values())) == 200